@@ -9,7 +9,26 @@ This is secure because:
 """
 
 from django.http import HttpResponse
-import re
+import ipaddress
+
+# Private IP ranges - RFC 1918
+PRIVATE_NETWORKS = (
+    ipaddress.ip_network('10.0.0.0/8'),
+    ipaddress.ip_network('172.16.0.0/12'),
+    ipaddress.ip_network('192.168.0.0/16'),
+)
+
+HEALTH_CHECK_PATHS = frozenset(['/health/', '/', '/api/health/', '/api/health'])
+
+
+def is_private_ip(ip):
+    """True if ip is a literal IPv4 address inside an RFC 1918 range."""
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        # Hostnames such as "10.example.com" are not IP literals
+        return False
+    return any(address in network for network in PRIVATE_NETWORKS)
 
 
 class ALBHealthCheckMiddleware:
@@ -23,26 +42,17 @@ class ALBHealthCheckMiddleware:
 
     def __init__(self, get_response):
         self.get_response = get_response
-        # Private IP patterns - RFC 1918
-        self.private_ip_patterns = [
-            re.compile(r'^10\.'),           # 10.0.0.0/8
-            re.compile(r'^172\.(1[6-9]|2[0-9]|3[0-1])\.'),  # 172.16.0.0/12
-            re.compile(r'^192\.168\.'),     # 192.168.0.0/16
-        ]
 
     def __call__(self, request):
         # Only handle health check paths
-        if request.path in ['/health/', '/', '/api/health/', '/api/health']:
+        if request.path in HEALTH_CHECK_PATHS:
             # Get the host header
             host = request.META.get('HTTP_HOST', '')
 
             # Extract IP from host (removes port if present)
             ip = host.split(':')[0]
 
-            # Check if it's a private IP
-            is_private_ip = any(pattern.match(ip) for pattern in self.private_ip_patterns)
-
-            if is_private_ip:
+            if is_private_ip(ip):
                 # Return 200 OK for health checks from private IPs
                 return HttpResponse('OK', status=200)
 
@@ -14,6 +14,7 @@ import hashlib
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime, date
 from decimal import Decimal
+from functools import lru_cache
 from django.conf import settings
 from django.db import models, transaction
 from django.core.exceptions import ValidationError
@@ -24,6 +25,12 @@ from cryptography.hazmat.backends import default_backend
 import base64
 import os
 
+# Field action meaning "replace the whole value"
+_REDACT = object()
+
+# Upper bound on memoised field-name classifications
+FIELD_ACTION_CACHE_SIZE = 4096
+
 
 class PIIMaskingService:
     """Service for masking PII in data structures"""
@@ -48,6 +55,32 @@ class PIIMaskingService:
         'street_address': lambda x: PIIMaskingService.mask_address(x),
     }
 
+    # Field name -> _REDACT, a PARTIAL_MASK_FIELDS function, or None
+    _FIELD_ACTIONS = {}
+
+    @classmethod
+    def _field_action(cls, field_name: str):
+        """
+        Classify a field name for masking, memoised per name
+
+        Sensitive names are matched by substring, so the result cannot be a
+        plain dict lookup; serializers repeat the same names on every record.
+        """
+        try:
+            return cls._FIELD_ACTIONS[field_name]
+        except KeyError:
+            pass
+
+        key_lower = field_name.lower()
+        if any(sensitive in key_lower for sensitive in cls.SENSITIVE_FIELDS):
+            action = _REDACT
+        else:
+            action = cls.PARTIAL_MASK_FIELDS.get(key_lower)
+
+        if len(cls._FIELD_ACTIONS) < FIELD_ACTION_CACHE_SIZE:
+            cls._FIELD_ACTIONS[field_name] = action
+        return action
+
     @staticmethod
     def mask_email(email: str) -> str:
         """Mask email address keeping first character and domain"""
@@ -122,15 +155,15 @@ class PIIMaskingService:
         if isinstance(data, dict):
             masked = {}
             for key, value in data.items():
-                key_lower = key.lower()
+                action = cls._field_action(key)
 
                 # Check if field should be completely masked
-                if any(sensitive in key_lower for sensitive in cls.SENSITIVE_FIELDS):
+                if action is _REDACT:
                     masked[key] = '***REDACTED***'
                 # Check if field should be partially masked
-                elif key_lower in cls.PARTIAL_MASK_FIELDS:
+                elif action is not None:
                     if isinstance(value, str):
-                        masked[key] = cls.PARTIAL_MASK_FIELDS[key_lower](value)
+                        masked[key] = action(value)
                     else:
                         masked[key] = '***REDACTED***'
                 # Recurse if deep masking
@@ -169,15 +202,16 @@ class PIIMaskingService:
         for field in model_instance._meta.fields:
             field_name = field.name
             field_value = getattr(model_instance, field_name)
+            action = cls._field_action(field_name)
 
             # Skip sensitive fields entirely
-            if any(sensitive in field_name.lower() for sensitive in cls.SENSITIVE_FIELDS):
+            if action is _REDACT:
                 continue
 
             # Partial mask certain fields
-            if field_name.lower() in cls.PARTIAL_MASK_FIELDS:
+            if action is not None:
                 if isinstance(field_value, str):
-                    safe_fields[field_name] = cls.PARTIAL_MASK_FIELDS[field_name.lower()](field_value)
+                    safe_fields[field_name] = action(field_value)
             else:
                 safe_fields[field_name] = field_value
 
@@ -208,27 +242,56 @@ class PIILoggingFilter(logging.Filter):
         (r'\b\d{4}-\d{2}-\d{2}\b', '****-**-**'),
     ]
 
+    # Compiled once at class load and applied in the same order as PII_PATTERNS
+    _COMPILED_PATTERNS = [(re.compile(pattern), replacement) for pattern, replacement in PII_PATTERNS]
+
+    # Every pattern needs a digit or an '@', so text without either is skipped
+    _MAY_CONTAIN_PII = re.compile(r'[\d@]').search
+
+    # Joins messages in filter_batch; no pattern can match or span a NUL
+    _BATCH_SEPARATOR = '\x00'
+
+    @classmethod
+    def mask(cls, text: str) -> str:
+        """Replace PII in a string with its masked form"""
+        if not cls._MAY_CONTAIN_PII(text):
+            return text
+        for pattern, replacement in cls._COMPILED_PATTERNS:
+            text = pattern.sub(replacement, text)
+        return text
+
     def filter(self, record):
         """Filter PII from log records"""
         # Mask the message
         if hasattr(record, 'msg'):
-            msg = str(record.msg)
-            for pattern, replacement in self.PII_PATTERNS:
-                msg = re.sub(pattern, replacement, msg)
-            record.msg = msg
+            record.msg = self.mask(str(record.msg))
 
         # Mask the arguments
         if hasattr(record, 'args') and record.args:
-            masked_args = []
-            for arg in record.args:
-                arg_str = str(arg)
-                for pattern, replacement in self.PII_PATTERNS:
-                    arg_str = re.sub(pattern, replacement, arg_str)
-                masked_args.append(arg_str)
-            record.args = tuple(masked_args)
+            record.args = tuple(self.mask(str(arg)) for arg in record.args)
 
         return True
 
+    def filter_batch(self, records: List[logging.LogRecord]) -> List[logging.LogRecord]:
+        """
+        Filter PII from several log records at once
+
+        Each record's message is formatted with its arguments, then all
+        messages are masked in one pass per pattern and split back. Records
+        are returned with the masked message and no arguments.
+        """
+        messages = [record.getMessage() for record in records]
+        separator = self._BATCH_SEPARATOR
+        if any(separator in message for message in messages):
+            masked = [self.mask(message) for message in messages]
+        else:
+            masked = self.mask(separator.join(messages)).split(separator)
+
+        for record, message in zip(records, masked):
+            record.msg = message
+            record.args = None
+        return records
+
 
 class SecureDataDeletion:
     """Service for secure deletion of sensitive data"""
@@ -308,6 +371,25 @@ class SecureDataDeletion:
             raise ValidationError(f"User {user_id} not found")
 
 
+@lru_cache(maxsize=4)
+def _derive_field_key(secret: bytes) -> bytes:
+    """
+    Derive the fallback field encryption key from the Django secret
+
+    PBKDF2 with 100,000 iterations is deliberately slow, so the result is
+    cached instead of being recomputed for every FieldEncryption instance.
+    """
+    salt = b'stable_salt_for_pii_encryption'  # Use a stable salt
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+        backend=default_backend()
+    )
+    return base64.urlsafe_b64encode(kdf.derive(secret))
+
+
 class FieldEncryption:
     """Service for field-level encryption of sensitive data"""
 
@@ -323,18 +405,7 @@ class FieldEncryption:
         if not key_str:
             # Generate a new key if not configured
             # In production, this should be stored securely
-            salt = b'stable_salt_for_pii_encryption'  # Use a stable salt
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=salt,
-                iterations=100000,
-                backend=default_backend()
-            )
-            key = base64.urlsafe_b64encode(
-                kdf.derive(settings.SECRET_KEY.encode()[:32])
-            )
-            return key
+            return _derive_field_key(settings.SECRET_KEY.encode()[:32])
 
         return key_str.encode()
 
@@ -346,6 +417,10 @@ class FieldEncryption:
         encrypted = self.cipher.encrypt(value.encode())
         return base64.urlsafe_b64encode(encrypted).decode()
 
+    def encrypt_batch(self, values: List[str]) -> List[str]:
+        """Encrypt several field values with the same cipher"""
+        return [self.encrypt_field(value) for value in values]
+
     def decrypt_field(self, encrypted_value: str) -> str:
         """Decrypt a field value"""
         if not encrypted_value:
@@ -1,4 +1,5 @@
 import datetime
+from types import MappingProxyType
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from core.models import Scenario, Client, Spouse, IncomeSource
 from core.tax_csv_loader import get_tax_loader
@@ -69,6 +70,33 @@ def round_decimal(value, places=2):
     quantizer = Decimal('0.01') if places == 2 else Decimal(10) ** -places
     return value.quantize(quantizer, rounding=ROUND_HALF_UP)
 
+def compound_balance(balance, annual_contribution, rate, contribution_years, total_years):
+    """
+    Closed-form balance after total_years of annual growth at rate.
+
+    annual_contribution is added at the start of each of the first
+    contribution_years years, before that year's growth is applied. This is
+    equivalent to looping year by year, without the per-year Decimal work.
+    """
+    if not isinstance(balance, Decimal):
+        balance = Decimal(str(balance))
+    if not isinstance(annual_contribution, Decimal):
+        annual_contribution = Decimal(str(annual_contribution))
+    if not isinstance(rate, Decimal):
+        rate = Decimal(str(rate))
+
+    total_years = max(int(total_years), 0)
+    contribution_years = min(max(int(contribution_years), 0), total_years)
+    factor = Decimal('1') + rate
+
+    growth = factor ** contribution_years
+    if rate == 0:
+        balance = balance + annual_contribution * contribution_years
+    else:
+        balance = balance * growth + annual_contribution * factor * (growth - 1) / rate
+
+    return balance * factor ** (total_years - contribution_years)
+
 class ScenarioProcessor:
     def __init__(self, scenario_id, debug=False):
         self.debug = debug
@@ -329,65 +357,89 @@ class ScenarioProcessor:
         instance._log_debug(f"Initialized from dictionaries with {len(instance.assets)} assets")
         instance._log_debug(f"Roth conversion parameters: start_year={getattr(instance.scenario, 'roth_conversion_start_year', None)}, duration={getattr(instance.scenario, 'roth_conversion_duration', None)}")
         
+        instance._init_projection_window()
+
+        # Set Roth conversion parameters
+        if hasattr(instance.scenario, 'roth_conversion_start_year') and hasattr(instance.scenario, 'roth_conversion_duration'):
+            instance._log_debug(f"Roth conversion parameters: start_year={instance.scenario.roth_conversion_start_year}, duration={instance.scenario.roth_conversion_duration}")
+        else:
+            instance._log_debug("No Roth conversion parameters set")
+        
+        return instance
+
+    @classmethod
+    def build_base(cls, scenario, client, spouse, assets, debug=False):
+        """
+        Validate scenario inputs once and return a reusable ScenarioProcessorBase.
+
+        The input dictionaries are copied, so callers may keep reusing them.
+        Use base.recalc() to run calculations with per-call overrides
+        (claiming ages, mortality ages, ...) without repeating from_dicts()
+        validation and birthdate parsing.
+        """
+        scenario = dict(scenario)
+        prototype = cls.from_dicts(
+            scenario,
+            dict(client),
+            dict(spouse) if spouse else None,
+            [dict(asset) for asset in assets or []],
+            debug=debug
+        )
+        return ScenarioProcessorBase(cls, scenario, prototype)
+
+    def _init_projection_window(self):
+        """Set start_year/end_year from retirement ages, mortality ages and asset end ages."""
         # STEP 1: Scenario Initialization
         current_year = datetime.datetime.now().year
         
         # Get scenario parameters with defaults
-        retirement_age_primary = getattr(instance.scenario, 'retirement_age', 65)
-        retirement_age_spouse = getattr(instance.scenario, 'spouse_retirement_age', 65)
-        mortality_age_primary = getattr(instance.scenario, 'mortality_age', 90)
-        mortality_age_spouse = getattr(instance.scenario, 'spouse_mortality_age', mortality_age_primary)
+        retirement_age_primary = getattr(self.scenario, 'retirement_age', 65)
+        retirement_age_spouse = getattr(self.scenario, 'spouse_retirement_age', 65)
+        mortality_age_primary = getattr(self.scenario, 'mortality_age', 90)
+        mortality_age_spouse = getattr(self.scenario, 'spouse_mortality_age', mortality_age_primary)
         
         # Add required inflation rates if missing
-        if not hasattr(instance.scenario, 'part_b_inflation_rate'):
-            setattr(instance.scenario, 'part_b_inflation_rate', 3.0)
-        if not hasattr(instance.scenario, 'part_d_inflation_rate'):
-            setattr(instance.scenario, 'part_d_inflation_rate', 3.0)
+        if not hasattr(self.scenario, 'part_b_inflation_rate'):
+            setattr(self.scenario, 'part_b_inflation_rate', 3.0)
+        if not hasattr(self.scenario, 'part_d_inflation_rate'):
+            setattr(self.scenario, 'part_d_inflation_rate', 3.0)
         
         # Calculate current ages
-        current_age_primary = current_year - instance.primary_birthdate.year
-        if instance.spouse_birthdate:
-            current_age_spouse = current_year - instance.spouse_birthdate.year
+        current_age_primary = current_year - self.primary_birthdate.year
+        if self.spouse_birthdate:
+            current_age_spouse = current_year - self.spouse_birthdate.year
         else:
             current_age_spouse = None
             
         # Calculate start year based on retirement
-        if instance.tax_status == "Single" or not instance.spouse_birthdate:
+        if self.tax_status == "Single" or not self.spouse_birthdate:
             years_until_retirement = retirement_age_primary - current_age_primary
-            instance.start_year = current_year + max(years_until_retirement, 0)
+            self.start_year = current_year + max(years_until_retirement, 0)
         else:
             years_until_retirement_primary = retirement_age_primary - current_age_primary
             years_until_retirement_spouse = retirement_age_spouse - current_age_spouse
             start_year_primary = current_year + max(years_until_retirement_primary, 0)
             start_year_spouse = current_year + max(years_until_retirement_spouse, 0)
-            instance.start_year = min(start_year_primary, start_year_spouse)
+            self.start_year = min(start_year_primary, start_year_spouse)
             
         # Calculate end years based on mortality
-        end_year_primary = instance.primary_birthdate.year + mortality_age_primary
-        end_year_spouse = instance.spouse_birthdate.year + mortality_age_spouse if instance.spouse_birthdate else end_year_primary
+        end_year_primary = self.primary_birthdate.year + mortality_age_primary
+        end_year_spouse = self.spouse_birthdate.year + mortality_age_spouse if self.spouse_birthdate else end_year_primary
         
         max_end_year = max(end_year_primary, end_year_spouse)
         
         # Check asset end years
-        for asset in instance.assets:
+        for asset in self.assets:
             start_age = asset.get("age_to_begin_withdrawal")
             end_age = asset.get("age_to_end_withdrawal")
             owner = asset.get("owned_by", "primary")
-            birthdate = instance.primary_birthdate if owner == "primary" else instance.spouse_birthdate
+            birthdate = self.primary_birthdate if owner == "primary" else self.spouse_birthdate
             if birthdate and end_age is not None:
                 asset_end_year = birthdate.year + end_age
                 if asset_end_year > max_end_year:
                     max_end_year = asset_end_year
                     
-        instance.end_year = max_end_year
-        
-        # Set Roth conversion parameters
-        if hasattr(instance.scenario, 'roth_conversion_start_year') and hasattr(instance.scenario, 'roth_conversion_duration'):
-            instance._log_debug(f"Roth conversion parameters: start_year={instance.scenario.roth_conversion_start_year}, duration={instance.scenario.roth_conversion_duration}")
-        else:
-            instance._log_debug("No Roth conversion parameters set")
-        
-        return instance
+        self.end_year = max_end_year
 
     def calculate(self):
         results = []
@@ -1149,36 +1201,13 @@ class ScenarioProcessor:
                 # roth_conversion_duration = getattr(self.scenario, 'roth_conversion_duration', None)
                 # roth_annual_amount = getattr(self.scenario, 'roth_conversion_annual_amount', 0)
 
-                for yr in range(years_to_grow):
-                    # Check if we should apply contributions for this year
-                    projection_year = current_year + yr
-                    projection_age = projection_year - birthdate.year
-
-                    # Apply contributions only if before withdrawal age
-                    if start_age is not None and projection_age < start_age:
-                        current_balance += annual_contribution
-                        self._log_debug(f"Projection Year {projection_year} - Age {projection_age} < {start_age}, added contribution: ${annual_contribution}")
-
-                    # Apply growth
-                    current_balance *= (1 + rate_of_return)
-
-                    # DISABLED: Apply Roth conversions during projection
-                    # Conversions should only be applied by RothConversionProcessor
-                    # if (roth_conversion_start and roth_conversion_duration and roth_annual_amount > 0 and
-                    #     asset.get("income_type") in ["Qualified", "Inherited Traditional Spouse", "Inherited Traditional Non-Spouse"] and
-                    #     projection_year >= roth_conversion_start and
-                    #     projection_year < roth_conversion_start + roth_conversion_duration):
-                    #
-                    #     # Calculate this asset's share of the conversion
-                    #     # For simplicity during projection, assume this is the only eligible asset
-                    #     # The actual pro-rata calculation happens during the main calculation loop
-                    #     conversion_amount = Decimal(str(roth_annual_amount))
-                    #
-                    #     # Don't convert more than available
-                    #     conversion_amount = min(conversion_amount, current_balance)
-                    #     current_balance -= conversion_amount
-                    #
-                    #     self._log_debug(f"Projection Year {projection_year} - Applied Roth conversion: ${conversion_amount:,.2f}, New balance: ${current_balance:,.2f}")
+                # Contributions apply only in projection years before withdrawal age
+                projection_start_age = current_year - birthdate.year
+                contribution_years = start_age - projection_start_age if start_age is not None else 0
+                current_balance = compound_balance(
+                    current_balance, annual_contribution, rate_of_return,
+                    contribution_years, years_to_grow
+                )
 
                 asset["previous_year_balance"] = current_balance
 
@@ -1197,18 +1226,13 @@ class ScenarioProcessor:
             
             self._log_debug(f"Year {year} - Catching up asset growth for {years_to_catch_up} years from {asset['last_processed_year']} to {year-1}")
             
-            # Process each missing year
-            for i in range(years_to_catch_up):
-                catch_up_year = asset["last_processed_year"] + i + 1
-                catch_up_age = catch_up_year - birthdate.year
-                
-                # Apply contributions only if before withdrawal age
-                if start_age is not None and catch_up_age < start_age:
-                    current_balance += annual_contribution
-                    self._log_debug(f"Catch-up Year {catch_up_year} - Age {catch_up_age} < {start_age}, added contribution: ${annual_contribution}")
-                
-                # Apply growth
-                current_balance *= (1 + rate_of_return)
+            # Contributions apply only in catch-up years before withdrawal age
+            catch_up_start_age = asset["last_processed_year"] + 1 - birthdate.year
+            contribution_years = start_age - catch_up_start_age if start_age is not None else 0
+            current_balance = compound_balance(
+                current_balance, annual_contribution, rate_of_return,
+                contribution_years, years_to_catch_up
+            )
             
             asset["previous_year_balance"] = current_balance
         
@@ -2113,6 +2137,63 @@ class ScenarioProcessor:
         return inheritance_tax
 
 
+class ScenarioProcessorBase:
+    """
+    Validated ScenarioProcessor inputs that can be recalculated with overrides.
+
+    Created by ScenarioProcessor.build_base(). The validated scenario and asset
+    dicts are stored read-only; recalc() layers overrides on fresh copies so the
+    base can be shared between requests.
+    """
+
+    def __init__(self, processor_cls, scenario, prototype):
+        self._processor_cls = processor_cls
+        self._prototype = prototype
+        self.scenario = MappingProxyType(scenario)
+        self.assets = tuple(MappingProxyType(asset) for asset in prototype.assets)
+
+    def processor(self, scenario_overrides=None, asset_overrides=None):
+        """
+        Build a ScenarioProcessor from the base with overrides applied.
+
+        Parameters:
+        - scenario_overrides: Dictionary of scenario fields to replace
+        - asset_overrides: Dictionary mapping asset id to a dictionary of asset fields to replace
+
+        Returns:
+        - ScenarioProcessor instance ready for calculate()
+        """
+        prototype = self._prototype
+        instance = self._processor_cls.__new__(self._processor_cls)
+        instance.debug = prototype.debug
+
+        scenario = dict(self.scenario)
+        if scenario_overrides:
+            scenario.update(scenario_overrides)
+        instance.scenario = type('obj', (object,), scenario)
+
+        instance.client = prototype.client
+        instance.spouse = prototype.spouse
+        instance.primary_birthdate = prototype.primary_birthdate
+        instance.spouse_birthdate = prototype.spouse_birthdate
+        instance.tax_status = prototype.tax_status
+
+        asset_overrides = asset_overrides or {}
+        assets = []
+        for asset in self.assets:
+            asset_dict = dict(asset)
+            asset_dict.update(asset_overrides.get(asset_dict.get('id'), {}))
+            assets.append(asset_dict)
+        instance.assets = assets
+
+        instance._init_projection_window()
+        return instance
+
+    def recalc(self, scenario_overrides=None, asset_overrides=None):
+        """Run calculate() on a processor built with the given overrides."""
+        return self.processor(scenario_overrides, asset_overrides).calculate()
+
+
 def calculate_taxable_social_security(ss_benefits, agi, tax_exempt_interest, filing_status):
     # Convert inputs to Decimal for consistency
     ss_benefits = Decimal(ss_benefits)
@@ -2224,30 +2305,16 @@ def calculate_asset_value_at_retirement(current_balance, monthly_contribution, a
     
     # Convert annual growth rate to decimal form (e.g., 7% -> 0.07)
     annual_rate_decimal = annual_growth_rate / Decimal('100')
-    
-    # Calculate the annual compounding factor
-    annual_factor = Decimal('1') + annual_rate_decimal
-    
-    # Accumulation phase: calculate future value with contributions
-    future_value = current_balance
-    
-    # Process each year until retirement - add contributions during this phase
-    for _ in range(years_until_retirement):
-        # Add annual contributions (12 months)
-        annual_contribution = monthly_contribution * 12
-        future_value += annual_contribution
-        
-        # Apply annual growth
-        future_value *= annual_factor
-    
-    # Store the value at retirement - no more contributions after this point
-    future_value_at_retirement = future_value
-    
-    # Decumulation phase: calculate future value without additional contributions
-    # Just apply growth during retirement years
-    for _ in range(years_in_retirement):
-        future_value *= annual_factor
-    
-    future_value_at_end_of_retirement = future_value
-    
+
+    # Contributions (12 months per year) are made until retirement, then the
+    # balance only grows during retirement years
+    years_until_retirement = max(years_until_retirement, 0)
+    future_value_at_end_of_retirement = compound_balance(
+        current_balance,
+        monthly_contribution * 12,
+        annual_rate_decimal,
+        years_until_retirement,
+        years_until_retirement + max(years_in_retirement, 0)
+    )
+
     return future_value_at_end_of_retirement
@@ -31,6 +31,7 @@ class CacheService:
         'scenario_results': 3600,      # 1 hour
         'monte_carlo': 7200,           # 2 hours
         'search_results': 600,         # 10 minutes
+        'ss_preview': 300,             # 5 minutes
         'default': 900                 # 15 minutes default
     }
     
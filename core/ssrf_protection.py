@@ -6,11 +6,32 @@ Validates and sanitizes URLs for external requests
 import ipaddress
 import re
 import socket
+import threading
+from http.cookiejar import DefaultCookiePolicy
 from urllib.parse import urlparse
 import logging
 
 logger = logging.getLogger(__name__)
 
+_session_local = threading.local()
+
+
+def _get_session():
+    """
+    Per-thread requests.Session so repeat calls to a host reuse its connection.
+
+    Cookies are never stored, so one caller's responses cannot leak state
+    into another caller's requests.
+    """
+    session = getattr(_session_local, 'session', None)
+    if session is None:
+        import requests
+
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        _session_local.session = session
+    return session
+
 
 class SSRFProtection:
     """
@@ -18,7 +39,7 @@ class SSRFProtection:
     """
 
     # Blocked IP ranges (private and reserved)
-    BLOCKED_IP_RANGES = [
+    BLOCKED_IP_RANGES = (
         ipaddress.ip_network('0.0.0.0/8'),        # Current network
         ipaddress.ip_network('10.0.0.0/8'),       # Private
         ipaddress.ip_network('100.64.0.0/10'),    # Shared Address Space
@@ -36,7 +57,12 @@ class SSRFProtection:
         ipaddress.ip_network('fc00::/7'),         # Unique local
         ipaddress.ip_network('fe80::/10'),        # Link local
         ipaddress.ip_network('ff00::/8'),         # Multicast
-    ]
+    )
+    # Split by IP version so a lookup only tests networks it can belong to
+    _BLOCKED_RANGES_BY_VERSION = {
+        4: tuple(n for n in BLOCKED_IP_RANGES if n.version == 4),
+        6: tuple(n for n in BLOCKED_IP_RANGES if n.version == 6),
+    }
 
     # Blocked hostnames
     BLOCKED_HOSTNAMES = [
@@ -50,9 +76,29 @@ class SSRFProtection:
         '169.254.169.254',  # Cloud metadata IP
     ]
 
+    # Suspicious URL patterns, matched against the lowercased URL
+    SUSPICIOUS_PATTERNS = (
+        r'@',  # Username in URL (potential bypass)
+        r'\[',  # IPv6 literal (often used for bypasses)
+        r'0x',  # Hex encoding
+        r'0o',  # Octal encoding
+        r'%00',  # Null byte
+        r'%0d%0a',  # CRLF injection
+        r'\.\./',  # Directory traversal
+        r'file://',  # File protocol
+        r'gopher://',  # Gopher protocol
+        r'dict://',  # Dict protocol
+        r'ftp://',  # FTP protocol
+        r'jar://',  # Java archive
+    )
+    SUSPICIOUS_PATTERN_RE = re.compile('|'.join(SUSPICIOUS_PATTERNS))
+
     # Allowed protocols
     ALLOWED_PROTOCOLS = ['http', 'https']
 
+    # HTTP methods accepted by safe_request
+    ALLOWED_METHODS = frozenset(['GET', 'POST', 'PUT', 'DELETE'])
+
     # Allowed domains for external requests (whitelist)
     ALLOWED_DOMAINS = [
         'auth0.com',
@@ -113,10 +159,9 @@ class SSRFProtection:
                 ip = ipaddress.ip_address(ip_address)
 
                 # Check against blocked IP ranges
-                for blocked_range in cls.BLOCKED_IP_RANGES:
-                    if ip in blocked_range:
-                        logger.warning(f"Blocked URL resolving to private IP: {ip}")
-                        return False, None
+                if cls.is_blocked_ip(ip):
+                    logger.warning(f"Blocked URL resolving to private IP: {ip}")
+                    return False, None
 
             except (socket.gaierror, ValueError) as e:
                 logger.warning(f"Could not resolve hostname {hostname}: {e}")
@@ -134,6 +179,19 @@ class SSRFProtection:
             logger.error(f"Error validating URL: {e}")
             return False, None
 
+    @classmethod
+    def is_blocked_ip(cls, ip):
+        """
+        Check if an address falls in a private or reserved range
+
+        Args:
+            ip: ipaddress.IPv4Address or IPv6Address
+
+        Returns:
+            bool: True if blocked
+        """
+        return any(ip in network for network in cls._BLOCKED_RANGES_BY_VERSION[ip.version])
+
     @classmethod
     def _is_allowed_domain(cls, hostname):
         """
@@ -165,27 +223,7 @@ class SSRFProtection:
         Returns:
             bool: True if suspicious
         """
-        suspicious_patterns = [
-            r'@',  # Username in URL (potential bypass)
-            r'\[',  # IPv6 literal (often used for bypasses)
-            r'0x',  # Hex encoding
-            r'0o',  # Octal encoding
-            r'%00',  # Null byte
-            r'%0d%0a',  # CRLF injection
-            r'\.\./',  # Directory traversal
-            r'file://',  # File protocol
-            r'gopher://',  # Gopher protocol
-            r'dict://',  # Dict protocol
-            r'ftp://',  # FTP protocol
-            r'jar://',  # Java archive
-        ]
-
-        url_lower = url.lower()
-        for pattern in suspicious_patterns:
-            if re.search(pattern, url_lower):
-                return True
-
-        return False
+        return cls.SUSPICIOUS_PATTERN_RE.search(url.lower()) is not None
 
     @classmethod
     def safe_request(cls, url, method='GET', **kwargs):
@@ -212,19 +250,13 @@ class SSRFProtection:
         kwargs.setdefault('timeout', 10)  # 10 second timeout
         kwargs.setdefault('allow_redirects', False)  # No redirects by default
 
+        if method not in cls.ALLOWED_METHODS:
+            logger.error(f"Unsupported HTTP method: {method}")
+            return None
+
         # Make request
         try:
-            if method == 'GET':
-                return requests.get(sanitized_url, **kwargs)
-            elif method == 'POST':
-                return requests.post(sanitized_url, **kwargs)
-            elif method == 'PUT':
-                return requests.put(sanitized_url, **kwargs)
-            elif method == 'DELETE':
-                return requests.delete(sanitized_url, **kwargs)
-            else:
-                logger.error(f"Unsupported HTTP method: {method}")
-                return None
+            return _get_session().request(method, sanitized_url, **kwargs)
 
         except requests.RequestException as e:
             logger.error(f"Request failed: {e}")
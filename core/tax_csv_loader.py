@@ -7,10 +7,37 @@ tax rates, brackets, and thresholds annually without code changes.
 
 import csv
 import os
+from bisect import bisect_left
 from decimal import Decimal
 from pathlib import Path
 from typing import Dict, List, Any
 
+# Defaults used when inflating IRMAA thresholds and surcharges
+DEFAULT_IRMAA_THRESHOLD_INFLATION = Decimal('1.0')  # percent per year
+DEFAULT_MEDICAL_INFLATION = Decimal('0.05')
+
+# Upper bound on memoised inflated IRMAA tables per loader
+INFLATED_IRMAA_CACHE_SIZE = 4096
+
+
+def _lookup_irmaa(thresholds: List[Dict[str, Any]], magis) -> List[tuple]:
+    """
+    Surcharges for each MAGI from thresholds sorted by magi_threshold.
+
+    Each MAGI gets the highest bracket whose threshold it strictly exceeds,
+    found by bisection on the threshold column.
+    """
+    keys = [t['magi_threshold'] for t in thresholds]
+    surcharges = []
+    for magi in magis:
+        index = bisect_left(keys, magi)
+        if index:
+            bracket = thresholds[index - 1]
+            surcharges.append((bracket['part_b_surcharge'], bracket['part_d_surcharge']))
+        else:
+            surcharges.append((Decimal('0'), Decimal('0')))
+    return surcharges
+
 class TaxCSVLoader:
     """Loads tax configuration data from CSV files."""
     
@@ -18,6 +45,8 @@ class TaxCSVLoader:
         self.tax_year = tax_year
         self.data_dir = Path(__file__).parent / 'tax_data'
         self._cache = {}
+        # (filing_status, target_year, part_b_rate, part_d_rate) -> inflated thresholds
+        self._inflated_irmaa_cache = {}
     
     def _load_csv(self, filename: str) -> List[Dict[str, Any]]:
         """Load CSV file and return list of dictionaries."""
@@ -147,12 +176,29 @@ class TaxCSVLoader:
         return rates
     
     def get_inflated_irmaa_thresholds(self, filing_status: str, target_year: int, part_b_inflation_rate: Decimal = None, part_d_inflation_rate: Decimal = None) -> List[Dict[str, Any]]:
-        """Get IRMAA thresholds inflated to target year."""
+        """
+        Get IRMAA thresholds inflated to target year.
+
+        Results are memoised per filing status, year and rates, since the
+        scenario processor asks for the same table several times per year.
+        The returned list is shared and must not be modified.
+        """
+        cache_key = (filing_status.lower(), target_year, part_b_inflation_rate, part_d_inflation_rate)
+        thresholds = self._inflated_irmaa_cache.get(cache_key)
+        if thresholds is None:
+            thresholds = self._inflate_irmaa_thresholds(filing_status, target_year, part_b_inflation_rate, part_d_inflation_rate)
+            if len(self._inflated_irmaa_cache) >= INFLATED_IRMAA_CACHE_SIZE:
+                self._inflated_irmaa_cache.clear()
+            self._inflated_irmaa_cache[cache_key] = thresholds
+        return thresholds
+
+    def _inflate_irmaa_thresholds(self, filing_status: str, target_year: int, part_b_inflation_rate: Decimal = None, part_d_inflation_rate: Decimal = None) -> List[Dict[str, Any]]:
+        """Inflate the base IRMAA thresholds and surcharges to target year."""
         base_thresholds = self.get_irmaa_thresholds(filing_status)
         inflation_rates = self.get_inflation_rates()
 
         # Get IRMAA threshold inflation rate (default 1% if not found)
-        irmaa_inflation_rate = inflation_rates.get('irmaa_thresholds', Decimal('1.0')) / 100
+        irmaa_inflation_rate = inflation_rates.get('irmaa_thresholds', DEFAULT_IRMAA_THRESHOLD_INFLATION) / 100
 
         # Calculate years to inflate from base year to target year
         years_to_inflate = target_year - self.tax_year
@@ -162,26 +208,25 @@ class TaxCSVLoader:
 
         # Use provided inflation rates or default to 5% medical inflation
         if part_b_inflation_rate is None:
-            part_b_inflation_rate = Decimal('0.05')
+            part_b_inflation_rate = DEFAULT_MEDICAL_INFLATION
         if part_d_inflation_rate is None:
-            part_d_inflation_rate = Decimal('0.05')
+            part_d_inflation_rate = DEFAULT_MEDICAL_INFLATION
+
+        # Growth factors are the same for every bracket, so compute them once
+        magi_factor = (1 + irmaa_inflation_rate) ** years_to_inflate
+        part_b_factor = (1 + part_b_inflation_rate) ** years_to_inflate
+        part_d_factor = (1 + part_d_inflation_rate) ** years_to_inflate
 
         inflated_thresholds = []
         for threshold in base_thresholds:
             inflated_threshold = threshold.copy()
 
             # Inflate the MAGI threshold (income levels) using IRMAA-specific inflation
-            original_magi = threshold['magi_threshold']
-            inflated_magi = original_magi * ((1 + irmaa_inflation_rate) ** years_to_inflate)
-            inflated_threshold['magi_threshold'] = inflated_magi
+            inflated_threshold['magi_threshold'] = threshold['magi_threshold'] * magi_factor
 
             # Inflate the IRMAA surcharge amounts using provided inflation rates
-            original_part_b = threshold['part_b_surcharge']
-            original_part_d = threshold['part_d_surcharge']
-            inflated_part_b = original_part_b * ((1 + part_b_inflation_rate) ** years_to_inflate)
-            inflated_part_d = original_part_d * ((1 + part_d_inflation_rate) ** years_to_inflate)
-            inflated_threshold['part_b_surcharge'] = inflated_part_b
-            inflated_threshold['part_d_surcharge'] = inflated_part_d
+            inflated_threshold['part_b_surcharge'] = threshold['part_b_surcharge'] * part_b_factor
+            inflated_threshold['part_d_surcharge'] = threshold['part_d_surcharge'] * part_d_factor
 
             inflated_thresholds.append(inflated_threshold)
 
@@ -190,17 +235,19 @@ class TaxCSVLoader:
     def calculate_irmaa_with_inflation(self, magi: Decimal, filing_status: str, target_year: int, part_b_inflation_rate: Decimal = None, part_d_inflation_rate: Decimal = None) -> tuple[Decimal, Decimal]:
         """Calculate IRMAA surcharges using inflated thresholds for target year."""
         thresholds = self.get_inflated_irmaa_thresholds(filing_status, target_year, part_b_inflation_rate, part_d_inflation_rate)
+        return _lookup_irmaa(thresholds, [magi])[0]
 
-        part_b_surcharge = Decimal('0')
-        part_d_surcharge = Decimal('0')
+    def calculate_irmaa_batch(self, magis, filing_status: str, target_year: int, part_b_inflation_rate: Decimal = None, part_d_inflation_rate: Decimal = None) -> List[tuple]:
+        """
+        Calculate IRMAA surcharges for several MAGI values in one target year.
 
-        for threshold in reversed(thresholds):  # Start from highest
-            if magi > threshold['magi_threshold']:
-                part_b_surcharge = threshold['part_b_surcharge']
-                part_d_surcharge = threshold['part_d_surcharge']
-                break
+        Thresholds are loaded and inflated once for the whole batch.
 
-        return part_b_surcharge, part_d_surcharge
+        Returns:
+            List of (part_b_surcharge, part_d_surcharge) in the order of magis
+        """
+        thresholds = self.get_inflated_irmaa_thresholds(filing_status, target_year, part_b_inflation_rate, part_d_inflation_rate)
+        return _lookup_irmaa(thresholds, magis)
     
     def get_state_tax_info(self, state_code: str) -> Dict[str, Any]:
         """Get state tax information."""
@@ -258,17 +305,7 @@ class TaxCSVLoader:
     def calculate_irmaa(self, magi: Decimal, filing_status: str = "Single") -> tuple[Decimal, Decimal]:
         """Calculate IRMAA surcharges based on MAGI."""
         thresholds = self.get_irmaa_thresholds(filing_status)
-        
-        part_b_surcharge = Decimal('0')
-        part_d_surcharge = Decimal('0')
-        
-        for threshold in reversed(thresholds):  # Start from highest
-            if magi > threshold['magi_threshold']:
-                part_b_surcharge = threshold['part_b_surcharge']
-                part_d_surcharge = threshold['part_d_surcharge']
-                break
-        
-        return part_b_surcharge, part_d_surcharge
+        return _lookup_irmaa(thresholds, [magi])[0]
     
     def get_available_tax_years(self) -> List[int]:
         """Get list of available tax years based on CSV files."""
@@ -0,0 +1,50 @@
+"""
+Test Asset Growth
+=================
+Tests for the closed-form compound growth used for asset projections.
+"""
+
+from decimal import Decimal
+from django.test import SimpleTestCase
+from core.scenario_processor import compound_balance, calculate_asset_value_at_retirement
+
+
+def _grow_year_by_year(balance, annual_contribution, rate, contribution_years, total_years):
+    """Reference implementation: contribution at the start of the year, then growth."""
+    balance = Decimal(str(balance))
+    for year in range(total_years):
+        if year < contribution_years:
+            balance += Decimal(str(annual_contribution))
+        balance *= (1 + Decimal(str(rate)))
+    return balance
+
+
+class TestCompoundBalance(SimpleTestCase):
+    """compound_balance must match the year-by-year loop it replaces"""
+
+    def assertMoneyEqual(self, first, second):
+        self.assertEqual(first.quantize(Decimal('0.01')), second.quantize(Decimal('0.01')))
+
+    def test_matches_loop_with_contributions(self):
+        self.assertMoneyEqual(
+            compound_balance(Decimal('100000'), Decimal('12000'), Decimal('0.07'), 10, 25),
+            _grow_year_by_year(100000, 12000, '0.07', 10, 25)
+        )
+
+    def test_growth_only(self):
+        self.assertMoneyEqual(
+            compound_balance(Decimal('50000'), 0, Decimal('0.05'), 0, 15),
+            _grow_year_by_year(50000, 0, '0.05', 0, 15)
+        )
+
+    def test_zero_rate(self):
+        self.assertEqual(compound_balance(Decimal('100'), Decimal('50'), Decimal('0'), 4, 10), Decimal('300'))
+
+    def test_negative_years_are_treated_as_zero(self):
+        self.assertEqual(compound_balance(Decimal('100'), Decimal('50'), Decimal('0.05'), -3, -1), Decimal('100'))
+
+    def test_asset_value_at_retirement(self):
+        self.assertMoneyEqual(
+            calculate_asset_value_at_retirement(250000, 500, 6, 12, 20),
+            _grow_year_by_year(250000, 6000, '0.06', 12, 32)
+        )
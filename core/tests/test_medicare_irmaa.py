@@ -125,6 +125,19 @@ class TestMedicareIRMAACalculations(TestCase):
         self.assertAlmostEqual(float(inflated_threshold), float(expected), places=0,
                                msg="IRMAA thresholds should inflate at configured rate")
 
+    def test_irmaa_batch_matches_single_calculation(self):
+        """Test batched IRMAA lookup agrees with per-MAGI calculation"""
+        tax_loader = TaxCSVLoader(2025)
+        magis = [Decimal(m) for m in (0, 50000, 105999, 106000, 200000, 394000, 500000)]
+
+        batch = tax_loader.calculate_irmaa_batch(magis, "Married Filing Separately", 2026)
+
+        expected = [
+            tax_loader.calculate_irmaa_with_inflation(magi, "Married Filing Separately", 2026)
+            for magi in magis
+        ]
+        self.assertEqual(batch, expected)
+
     def test_hold_harmless_protection(self):
         """Test Hold Harmless provision protects Social Security"""
         # Create Social Security income
@@ -0,0 +1,67 @@
+"""
+Test PII Logging Filter
+=======================
+Tests that PIILoggingFilter.filter_batch masks the same text as masking each
+record on its own, folds arguments into the message, and falls back to
+per-message masking when a message contains the batch separator.
+"""
+
+import logging
+from unittest import mock
+from django.test import SimpleTestCase
+from core.pii_protection import PIILoggingFilter
+
+
+def _record(msg, *args):
+    return logging.LogRecord('test', logging.INFO, __file__, 1, msg, args or None, None)
+
+
+class TestPIILoggingFilterBatch(SimpleTestCase):
+    """filter_batch must mask PII exactly where per-record masking would"""
+
+    def setUp(self):
+        self.pii_filter = PIILoggingFilter()
+
+    def test_only_records_with_pii_are_masked(self):
+        records = [
+            _record('Scenario saved'),
+            _record('Client SSN 123-45-6789'),
+            _record('Invite sent to jane.doe@example.com'),
+            _record('Recalculated in %s years', 'thirty'),
+        ]
+
+        self.pii_filter.filter_batch(records)
+
+        self.assertEqual([record.msg for record in records], [
+            'Scenario saved',
+            'Client SSN ***-**-****',
+            'Invite sent to ***@***.***',
+            'Recalculated in thirty years',
+        ])
+
+    def test_args_are_folded_into_message(self):
+        record = _record('Client %s has SSN %s', 'Jane', '123-45-6789')
+
+        self.pii_filter.filter_batch([record])
+
+        self.assertEqual(record.msg, 'Client Jane has SSN ***-**-****')
+        self.assertIsNone(record.args)
+        self.assertEqual(record.getMessage(), 'Client Jane has SSN ***-**-****')
+
+    def test_separator_in_message_masks_each_record(self):
+        records = [_record('a\x00b 123-45-6789'), _record('c@example.com')]
+
+        with mock.patch.object(PIILoggingFilter, 'mask', wraps=PIILoggingFilter.mask) as mask:
+            self.pii_filter.filter_batch(records)
+
+        self.assertEqual(mask.call_count, 2)
+        self.assertEqual([record.msg for record in records], ['a\x00b ***-**-****', '***@***.***'])
+
+    def test_batch_joins_messages_into_one_mask_call(self):
+        records = [_record('SSN 123-45-6789'), _record('Call 555-123-4567')]
+
+        with mock.patch.object(PIILoggingFilter, 'mask', wraps=PIILoggingFilter.mask) as mask:
+            self.pii_filter.filter_batch(records)
+
+        mask.assert_called_once()
+        self.assertEqual([record.msg for record in records], ['SSN ***-**-****', 'Call ***-***-****'])
@@ -0,0 +1,134 @@
+"""
+Test ScenarioProcessorBase
+==========================
+Tests that processors derived from a shared ScenarioProcessorBase match a
+fresh ScenarioProcessor.from_dicts() run with the same overrides, and that
+recalculating does not mutate the shared base.
+"""
+
+import copy
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from core.scenario_processor import ScenarioProcessor
+
+
+SCENARIO = {
+    'retirement_age': 65,
+    'spouse_retirement_age': 65,
+    'mortality_age': 90,
+    'spouse_mortality_age': 92,
+    'primary_ss_claiming_age': None,
+    'spouse_ss_claiming_age': None,
+    'apply_standard_deduction': True,
+    'primary_state': 'CA',
+    'survivor_takes_higher_benefit': False,
+    'medicare_age': 65,
+    'spouse_medicare_age': 65,
+    'part_b_inflation_rate': 5.0,
+    'part_d_inflation_rate': 6.0,
+}
+
+CLIENT = {
+    'tax_status': 'Married Filing Jointly',
+    'gender': 'Male',
+    'birthdate': date(1962, 3, 15),
+    'first_name': 'Test',
+    'last_name': 'Client',
+    'email': 'client@example.com',
+    'state': 'CA',
+}
+
+SPOUSE = {
+    'gender': 'Female',
+    'birthdate': date(1964, 7, 1),
+    'first_name': 'Test',
+    'last_name': 'Spouse',
+}
+
+ASSETS = [
+    {
+        'id': 1,
+        'income_type': 'social_security',
+        'income_name': 'Primary SS',
+        'owned_by': 'primary',
+        'amount_at_fra': Decimal('3000'),
+        'monthly_amount': Decimal('3000'),
+        'age_to_begin_withdrawal': 67,
+        'cola': Decimal('2'),
+    },
+    {
+        'id': 2,
+        'income_type': 'social_security',
+        'income_name': 'Spouse SS',
+        'owned_by': 'spouse',
+        'amount_at_fra': Decimal('1800'),
+        'monthly_amount': Decimal('1800'),
+        'age_to_begin_withdrawal': 67,
+        'cola': Decimal('2'),
+    },
+    {
+        'id': 3,
+        'income_type': 'Qualified',
+        'income_name': '401k',
+        'owned_by': 'primary',
+        'current_asset_balance': Decimal('750000'),
+        'monthly_contribution': Decimal('1000'),
+        'rate_of_return': Decimal('6'),
+        'age_to_begin_withdrawal': 65,
+        'age_to_end_withdrawal': 90,
+        'monthly_amount': Decimal('3500'),
+    },
+]
+
+SCENARIO_OVERRIDES = {
+    'mortality_age': 88,
+    'spouse_mortality_age': 95,
+    'primary_ss_claiming_age': 70,
+    'spouse_ss_claiming_age': 62,
+    'survivor_takes_higher_benefit': True,
+}
+
+ASSET_OVERRIDES = {
+    1: {'age_to_begin_withdrawal': 70},
+    2: {'age_to_begin_withdrawal': 62},
+}
+
+
+def _fresh_run():
+    """Calculate with overrides merged into new input dicts, as before build_base existed."""
+    scenario = dict(SCENARIO, **SCENARIO_OVERRIDES)
+    assets = copy.deepcopy(ASSETS)
+    for asset in assets:
+        asset.update(ASSET_OVERRIDES.get(asset['id'], {}))
+    processor = ScenarioProcessor.from_dicts(scenario, dict(CLIENT), dict(SPOUSE), assets)
+    return processor.calculate()
+
+
+class TestScenarioProcessorBase(TestCase):
+    """Processors built from a base must behave like fresh from_dicts() processors"""
+
+    def setUp(self):
+        self.base = ScenarioProcessor.build_base(SCENARIO, CLIENT, SPOUSE, ASSETS)
+
+    def test_processor_matches_fresh_from_dicts(self):
+        results = self.base.processor(SCENARIO_OVERRIDES, ASSET_OVERRIDES).calculate()
+        self.assertEqual(results, _fresh_run())
+
+    def test_recalc_is_repeatable(self):
+        first = self.base.recalc(SCENARIO_OVERRIDES, ASSET_OVERRIDES)
+        second = self.base.recalc(SCENARIO_OVERRIDES, ASSET_OVERRIDES)
+        self.assertEqual(first, second)
+
+    def test_recalc_does_not_mutate_base(self):
+        scenario_before = dict(self.base.scenario)
+        assets_before = [dict(asset) for asset in self.base.assets]
+
+        self.base.recalc(SCENARIO_OVERRIDES, ASSET_OVERRIDES)
+
+        self.assertEqual(dict(self.base.scenario), scenario_before)
+        self.assertEqual([dict(asset) for asset in self.base.assets], assets_before)
+
+    def test_build_base_does_not_mutate_inputs(self):
+        self.assertNotIn('previous_year_balance', ASSETS[2])
+        self.assertNotIn('reduction_2030_ss', SCENARIO)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SsPlanningConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ss_planning'
+
+    def ready(self):
+        import ss_planning.signals  # noqa: F401 - registers cache invalidation receivers
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-16 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ss_planning', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='ssstrategy',
+            name='ss_planning_scenari_da90d7_idx',
+        ),
+        migrations.AddIndex(
+            model_name='ssstrategy',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['scenario'], name='ss_strategy_active_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ss_planning', '0002_ssstrategy_active_partial_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ssstrategy',
+            name='optimal_rank',
+            field=models.IntegerField(blank=True, help_text='Rank among saved strategies by net lifetime benefits (1 = best)', null=True),
+        ),
+        migrations.AlterField(
+            model_name='ssstrategy',
+            name='percentage_of_maximum',
+            field=models.FloatField(blank=True, help_text="Percentage of the best saved strategy's net lifetime benefits", null=True),
+        ),
+    ]
@@ -167,12 +167,12 @@ class SSStrategy(models.Model):
     optimal_rank = models.IntegerField(
         null=True,
         blank=True,
-        help_text="Rank among all possible strategies (1 = best)"
+        help_text="Rank among saved strategies by net lifetime benefits (1 = best)"
     )
     percentage_of_maximum = models.FloatField(
         null=True,
         blank=True,
-        help_text="Percentage of maximum possible lifetime benefits"
+        help_text="Percentage of the best saved strategy's net lifetime benefits"
     )
 
     # Notes
@@ -195,7 +195,11 @@ class SSStrategy(models.Model):
         verbose_name_plural = "SS Strategies"
         ordering = ['-is_active', '-created_at']
         indexes = [
-            models.Index(fields=['scenario', 'is_active']),
+            models.Index(
+                fields=['scenario'],
+                condition=models.Q(is_active=True),
+                name='ss_strategy_active_idx'
+            ),
             models.Index(fields=['scenario', 'created_at']),
         ]
 
@@ -5,7 +5,13 @@ This module provides business logic for Social Security planning,
 wrapping the existing scenario_processor calculations without modifying it.
 """
 
+import logging
+import threading
+import uuid
+from collections import OrderedDict
 from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection, transaction
 from django.utils import timezone
 from decimal import Decimal
 
@@ -19,6 +25,123 @@ from .utils import (
 )
 
 
+logger = logging.getLogger(__name__)
+
+# Process-local cache of ScenarioProcessorBase objects built from the
+# claiming-age independent preview inputs, keyed by scenario pk and validated
+# against scenario.updated_at and the shared input version on every lookup.
+_PROCESSOR_BASE_CACHE = OrderedDict()
+_PROCESSOR_BASE_CACHE_SIZE = 128
+_PROCESSOR_BASE_LOCK = threading.Lock()
+
+
+# Scenario ids waiting for the current transaction to commit, mapped to
+# whether their preview inputs changed (True) or only their saved strategies
+# (False). Every signal registers its own on_commit flush, but the first one
+# to run handles the whole batch, so a save that touches many rows costs a
+# single cache round trip. Ids left behind by a rolled back transaction are
+# flushed with the next commit on this thread, which at worst invalidates a
+# preview early.
+_pending_invalidations = threading.local()
+
+
+def _queue_invalidation(scenario_ids, inputs_changed):
+    pending = _pending_invalidations.__dict__.setdefault('scenarios', {})
+    for scenario_id in scenario_ids:
+        pending[scenario_id] = pending.get(scenario_id, False) or inputs_changed
+    transaction.on_commit(_flush_pending_invalidations)
+
+
+def invalidate_scenario_cache_on_commit(*scenario_ids):
+    """Invalidate preview inputs and responses once the surrounding transaction commits."""
+    _queue_invalidation(scenario_ids, inputs_changed=True)
+
+
+def invalidate_preview_responses_on_commit(*scenario_ids):
+    """Invalidate preview responses, but not the processor base, once the transaction commits."""
+    _queue_invalidation(scenario_ids, inputs_changed=False)
+
+
+def _flush_pending_invalidations():
+    pending = _pending_invalidations.__dict__.pop('scenarios', None)
+    if not pending:
+        return
+    input_ids = [scenario_id for scenario_id, inputs_changed in pending.items() if inputs_changed]
+    with _PROCESSOR_BASE_LOCK:
+        for scenario_id in input_ids:
+            _PROCESSOR_BASE_CACHE.pop(scenario_id, None)
+    _set_new_versions(
+        [_input_version_key(scenario_id) for scenario_id in input_ids]
+        + [_response_version_key(scenario_id) for scenario_id in pending]
+    )
+
+
+# Version tokens expire so that a bump lost to a cache outage goes stale
+# within a day rather than never
+PREVIEW_VERSION_TIMEOUT = 86400
+
+# Default for generate_preview(input_version=...): read the token from the cache
+_READ_INPUT_VERSION = object()
+
+
+def _input_version_key(scenario_id):
+    return f"ss_preview_version:{scenario_id}"
+
+
+def _response_version_key(scenario_id):
+    return f"ss_preview_response_version:{scenario_id}"
+
+
+def get_preview_versions(scenario_id):
+    """
+    Tokens shared across processes that change with a scenario's preview data.
+
+    Returns an (input_version, response_version) tuple. The input version
+    changes with anything the processor base is built from (scenario, income
+    sources, client, spouse) that does not necessarily touch
+    scenario.updated_at. The response version also changes when saved
+    strategies do, since the active strategy feeds comparison_to_current;
+    preview ETags and cached responses use both. Random tokens are used
+    rather than counters so an evicted key can never reissue an old value.
+
+    Returns None when the cache is unavailable; callers then skip every
+    cache layer that depends on the tokens.
+    """
+    keys = (_input_version_key(scenario_id), _response_version_key(scenario_id))
+    try:
+        found = cache.get_many(keys)
+        return tuple(
+            found.get(key) or cache.get_or_set(key, lambda: uuid.uuid4().hex, timeout=PREVIEW_VERSION_TIMEOUT)
+            for key in keys
+        )
+    except Exception as e:
+        logger.error("Cache get error for keys %s: %s", list(keys), e)
+        return None
+
+
+def _set_new_versions(keys):
+    """
+    Replace version tokens with fresh ones.
+
+    Runs after model saves and deletes, so cache errors are logged and never
+    propagated to the caller.
+    """
+    if not keys:
+        return
+    try:
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=PREVIEW_VERSION_TIMEOUT)
+    except Exception as e:
+        logger.error("Cache set error for keys %s: %s", list(keys), e)
+
+
+def bump_preview_version(*scenario_ids):
+    """Invalidate every cached processor base, preview ETag and cached preview for the scenarios."""
+    _set_new_versions(
+        [_input_version_key(scenario_id) for scenario_id in scenario_ids]
+        + [_response_version_key(scenario_id) for scenario_id in scenario_ids]
+    )
+
+
 class SSPreviewService:
     """
     Service for generating Social Security claiming strategy previews.
@@ -30,7 +153,7 @@ class SSPreviewService:
     @staticmethod
     def generate_preview(scenario, primary_claiming_age, spouse_claiming_age=None,
                         life_expectancy_primary=None, life_expectancy_spouse=None,
-                        survivor_takes_higher_benefit=None):
+                        survivor_takes_higher_benefit=None, input_version=_READ_INPUT_VERSION):
         """
         Generate preview of SS strategy by temporarily modifying scenario and running calculations.
 
@@ -41,6 +164,8 @@ class SSPreviewService:
             life_expectancy_primary (int, optional): Override life expectancy
             life_expectancy_spouse (int, optional): Override life expectancy
             survivor_takes_higher_benefit (bool, optional): Override survivor benefit setting
+            input_version (str, optional): Input version from get_preview_versions(),
+                read from the cache when omitted; None disables processor base reuse
 
         Returns:
             dict: Preview results with years, summary, and comparison
@@ -54,36 +179,34 @@ class SSPreviewService:
         # if cached:
         #     return cached
 
-        # Create temporary scenario data dicts
-        scenario_dict, client_dict, spouse_dict, assets_list = SSPreviewService._create_temp_scenario_dicts(
-            scenario, primary_claiming_age, spouse_claiming_age,
+        # Reuse the validated scenario inputs and only swap in the claiming ages
+        base = SSPreviewService._get_processor_base(scenario, input_version)
+        scenario_overrides, asset_overrides = SSPreviewService._apply_age_overrides(
+            base, primary_claiming_age, spouse_claiming_age,
             life_expectancy_primary, life_expectancy_spouse,
             survivor_takes_higher_benefit
         )
+        processor = base.processor(scenario_overrides, asset_overrides)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "SS preview scenario=%s primary_claiming_age=%s mortality_age=%s "
+                "survivor_takes_higher_benefit=%s assets=%s ss_claiming_ages=%s",
+                scenario.id, primary_claiming_age,
+                getattr(processor.scenario, 'mortality_age', None),
+                getattr(processor.scenario, 'survivor_takes_higher_benefit', None),
+                len(processor.assets),
+                [(a['owned_by'], a['age_to_begin_withdrawal'])
+                 for a in processor.assets if a['income_type'] == 'social_security']
+            )
 
-        print(f"\n{'='*80}")
-        print(f"DEBUG: Running ScenarioProcessor.from_dicts")
-        print(f"  Scenario ID: {scenario.id}")
-        print(f"  Primary claiming age: {primary_claiming_age}")
-        print(f"  Mortality age: {scenario_dict.get('mortality_age')}")
-        print(f"  Survivor takes higher benefit: {scenario_dict.get('survivor_takes_higher_benefit')}")
-        print(f"  Number of assets: {len(assets_list)}")
-
-        # Find SS assets and print their claiming ages
-        ss_assets = [a for a in assets_list if a['income_type'] == 'social_security']
-        for ss in ss_assets:
-            print(f"  SS Asset ({ss['owned_by']}): claiming age = {ss['age_to_begin_withdrawal']}")
-        print(f"{'='*80}\n")
-
-        # Run scenario_processor calculations using from_dicts
-        processor = ScenarioProcessor.from_dicts(scenario_dict, client_dict, spouse_dict, assets_list)
         results = processor.calculate()
 
         # ScenarioProcessor.calculate() returns a list directly, not a dict with 'years' key
         if isinstance(results, list):
             results = {'years': results}
 
-        print(f"\nDEBUG: ScenarioProcessor returned {len(results.get('years', []))} years of data\n")
+        logger.debug("ScenarioProcessor returned %s years of data", len(results.get('years', [])))
 
         # Extract and format results
         preview_data = SSPreviewService._format_preview_results(
@@ -124,27 +247,55 @@ class SSPreviewService:
         return None
 
     @staticmethod
-    def _create_temp_scenario_dicts(scenario, primary_age, spouse_age, life_exp_primary, life_exp_spouse, survivor_override=None):
-        """Create dictionary representations of scenario data with modified claiming ages."""
-        from django.forms.models import model_to_dict
+    def _get_processor_base(scenario, input_version=_READ_INPUT_VERSION):
+        """
+        Return a ScenarioProcessorBase for the scenario, reusing a cached one when possible.
 
-        # Use override if provided, otherwise use scenario setting
-        survivor_setting = survivor_override if survivor_override is not None else getattr(scenario, 'survivor_takes_higher_benefit', False)
+        Entries are validated against scenario.updated_at and the shared
+        input version token. The invalidation signals only clear this
+        cache in the process that saved; the token carries the change to
+        every other worker. Without a token (cache down) nothing is reused.
+        """
+        if input_version is _READ_INPUT_VERSION:
+            versions = get_preview_versions(scenario.pk)
+            input_version = versions[0] if versions else None
+        if input_version is None:
+            return ScenarioProcessor.build_base(*SSPreviewService._build_base_dicts(scenario))
+
+        version = (getattr(scenario, 'updated_at', None), input_version)
+        with _PROCESSOR_BASE_LOCK:
+            cached = _PROCESSOR_BASE_CACHE.get(scenario.pk)
+            if cached is not None and cached[0] == version:
+                _PROCESSOR_BASE_CACHE.move_to_end(scenario.pk)
+                return cached[1]
+
+        base = ScenarioProcessor.build_base(*SSPreviewService._build_base_dicts(scenario))
+
+        with _PROCESSOR_BASE_LOCK:
+            _PROCESSOR_BASE_CACHE[scenario.pk] = (version, base)
+            _PROCESSOR_BASE_CACHE.move_to_end(scenario.pk)
+            while len(_PROCESSOR_BASE_CACHE) > _PROCESSOR_BASE_CACHE_SIZE:
+                _PROCESSOR_BASE_CACHE.popitem(last=False)
 
+        return base
+
+    @staticmethod
+    def _build_base_dicts(scenario):
+        """Build the scenario/client/spouse/asset dicts that do not depend on claiming ages."""
         # Convert scenario to dict
         scenario_dict = {
             'retirement_age': scenario.retirement_age,
             'spouse_retirement_age': getattr(scenario, 'spouse_retirement_age', None),
-            'mortality_age': life_exp_primary or scenario.mortality_age,
-            'spouse_mortality_age': life_exp_spouse or getattr(scenario, 'spouse_mortality_age', None),
+            'mortality_age': scenario.mortality_age,
+            'spouse_mortality_age': getattr(scenario, 'spouse_mortality_age', None),
             'reduction_2030_ss': getattr(scenario, 'reduction_2030_ss', False),
             'ss_adjustment_year': getattr(scenario, 'ss_adjustment_year', 2030),
             'ss_adjustment_percentage': getattr(scenario, 'ss_adjustment_percentage', 0),
-            'primary_ss_claiming_age': primary_age,
-            'spouse_ss_claiming_age': spouse_age,
+            'primary_ss_claiming_age': None,
+            'spouse_ss_claiming_age': None,
             'apply_standard_deduction': getattr(scenario, 'apply_standard_deduction', True),
             'primary_state': getattr(scenario, 'primary_state', None),
-            'survivor_takes_higher_benefit': survivor_setting,
+            'survivor_takes_higher_benefit': getattr(scenario, 'survivor_takes_higher_benefit', False),
             # Medicare/IRMAA fields
             'medicare_age': getattr(scenario, 'medicare_age', 65),
             'spouse_medicare_age': getattr(scenario, 'spouse_medicare_age', 65),
@@ -180,7 +331,7 @@ class SSPreviewService:
         # Convert income sources to list of dicts
         assets_list = []
         for asset in scenario.income_sources.all():
-            asset_dict = {
+            assets_list.append({
                 'id': asset.id,
                 'income_type': asset.income_type,
                 'income_name': getattr(asset, 'income_name', ''),
@@ -197,18 +348,39 @@ class SSPreviewService:
                 'cola': getattr(asset, 'cola', 0),
                 'survivor_benefit': getattr(asset, 'survivor_benefit', 0),
                 'pension_start_age': getattr(asset, 'pension_start_age', None),
-            }
+            })
 
-            # Update Social Security claiming ages
-            if asset.income_type == 'social_security':
-                if asset.owned_by == 'primary':
-                    asset_dict['age_to_begin_withdrawal'] = int(primary_age)
-                elif asset.owned_by == 'spouse' and spouse_age:
-                    asset_dict['age_to_begin_withdrawal'] = int(spouse_age)
+        return scenario_dict, client_dict, spouse_dict, assets_list
 
-            assets_list.append(asset_dict)
+    @staticmethod
+    def _apply_age_overrides(base, primary_age, spouse_age, life_exp_primary, life_exp_spouse, survivor_override=None):
+        """
+        Build the scenario and asset overrides for a preview on top of a ScenarioProcessorBase.
 
-        return scenario_dict, client_dict, spouse_dict, assets_list
+        Returns:
+            tuple: (scenario_overrides dict, asset_overrides dict keyed by asset id)
+        """
+        scenario_overrides = {
+            'mortality_age': life_exp_primary or base.scenario['mortality_age'],
+            'spouse_mortality_age': life_exp_spouse or base.scenario['spouse_mortality_age'],
+            'primary_ss_claiming_age': primary_age,
+            'spouse_ss_claiming_age': spouse_age,
+        }
+        # Use override if provided, otherwise use scenario setting
+        if survivor_override is not None:
+            scenario_overrides['survivor_takes_higher_benefit'] = survivor_override
+
+        # Update Social Security claiming ages
+        asset_overrides = {}
+        for asset in base.assets:
+            if asset['income_type'] != 'social_security':
+                continue
+            if asset['owned_by'] == 'primary':
+                asset_overrides[asset['id']] = {'age_to_begin_withdrawal': int(primary_age)}
+            elif asset['owned_by'] == 'spouse' and spouse_age:
+                asset_overrides[asset['id']] = {'age_to_begin_withdrawal': int(spouse_age)}
+
+        return scenario_overrides, asset_overrides
 
     @staticmethod
     def _format_preview_results(results, original_scenario, primary_age, spouse_age):
@@ -235,13 +407,6 @@ class SSPreviewService:
     @staticmethod
     def _calculate_summary_metrics(years_data, primary_age, spouse_age):
         """Calculate summary metrics from year-by-year data."""
-        print(f"\n{'='*80}")
-        print(f"DEBUG: _calculate_summary_metrics called")
-        print(f"  Primary claiming age: {primary_age}")
-        print(f"  Spouse claiming age: {spouse_age}")
-        print(f"  Number of years in data: {len(years_data)}")
-        print(f"{'='*80}\n")
-
         total_ss_primary = sum(
             Decimal(str(y.get('ss_income_primary_gross', 0)))
             for y in years_data
@@ -260,37 +425,18 @@ class SSPreviewService:
             Decimal(str(y.get('irmaa_surcharge', 0)))
             for y in years_data
         )
-        # Total Medicare costs (for reference)
-        total_medicare = sum(
-            Decimal(str(y.get('total_medicare', 0)))
-            for y in years_data
-        )
-
-        # DEBUG: Print detailed breakdown
-        print(f"DEBUG: Summary calculation breakdown:")
-        print(f"  Total SS Primary: ${total_ss_primary:,.2f}")
-        print(f"  Total SS Spouse: ${total_ss_spouse:,.2f}")
-        print(f"  Total ALL Taxes (federal + state): ${total_all_taxes:,.2f}")
-        print(f"  Total IRMAA (irmaa_surcharge): ${total_irmaa:,.2f}")
-        print(f"  Total Medicare (total_medicare): ${total_medicare:,.2f}")
-
-        # DEBUG: Sample first year and check for survivor benefit years
-        print(f"\nDEBUG: First year data:")
-        if years_data:
-            year = years_data[0]
-            print(f"  Age: {year.get('primary_age')}")
-            print(f"  Primary SS: ${year.get('ss_income_primary_gross', 0):,.2f}")
-            print(f"  Spouse SS: ${year.get('ss_income_spouse_gross', 0):,.2f}")
-            print(f"  Total SS: ${year.get('ss_income_primary_gross', 0) + year.get('ss_income_spouse_gross', 0):,.2f}")
-
-        # DEBUG: Check a year after expected death (assuming ~85 mortality)
-        if len(years_data) > 20:
-            late_year = years_data[20]
-            print(f"\nDEBUG: Year 20+ data (checking for survivor benefits):")
-            print(f"  Primary age: {late_year.get('primary_age')}")
-            print(f"  Primary SS: ${late_year.get('ss_income_primary_gross', 0):,.2f}")
-            print(f"  Spouse SS: ${late_year.get('ss_income_spouse_gross', 0):,.2f}")
-            print(f"  Total SS: ${late_year.get('ss_income_primary_gross', 0) + late_year.get('ss_income_spouse_gross', 0):,.2f}")
+        if logger.isEnabledFor(logging.DEBUG):
+            # Total Medicare costs (for reference)
+            total_medicare = sum(
+                Decimal(str(y.get('total_medicare', 0)))
+                for y in years_data
+            )
+            logger.debug(
+                "SS summary primary_age=%s spouse_age=%s years=%s ss_primary=%.2f "
+                "ss_spouse=%.2f taxes=%.2f irmaa=%.2f medicare=%.2f",
+                primary_age, spouse_age, len(years_data), total_ss_primary,
+                total_ss_spouse, total_all_taxes, total_irmaa, total_medicare
+            )
 
         # Find asset depletion age (first year assets go to zero)
         asset_depletion_age = None
@@ -318,7 +464,9 @@ class SSPreviewService:
     def _calculate_comparison(original_scenario, new_summary):
         """Calculate delta between new strategy and current/saved strategy."""
         # Get current active strategy or use scenario defaults
-        current_strategy = original_scenario.ss_strategies.filter(is_active=True).first()
+        current_strategy = original_scenario.ss_strategies.filter(is_active=True).only(
+            'lifetime_benefits_total', 'net_lifetime_benefits'
+        ).first()
 
         if not current_strategy:
             # No saved strategy, compare to scenario defaults
@@ -360,9 +508,8 @@ class SSPreviewService:
                     'expires_at': timezone.now() + timedelta(hours=24)
                 }
             )
-        except Exception as e:
-            # Log error but don't fail the request
-            print(f"Failed to cache SS preview: {e}")
+        except Exception:
+            logger.exception("Failed to cache SS preview for scenario %s", scenario.pk)
 
 
 class SSStrategyService:
@@ -420,8 +567,45 @@ class SSStrategyService:
             }
         )
 
+        SSStrategyService.update_rankings(scenario.pk)
+        strategy.refresh_from_db(fields=['optimal_rank', 'percentage_of_maximum'])
+
         return strategy
 
+    @staticmethod
+    def update_rankings(scenario_id):
+        """
+        Recompute optimal_rank and percentage_of_maximum for every strategy of a scenario.
+
+        Ranking is done by net lifetime benefits in a single UPDATE using window
+        functions, since the ORM cannot combine Window expressions with update().
+        Tied strategies share a rank. Strategies without net lifetime benefits
+        get neither a rank nor a percentage, and percentages are only defined
+        when the best strategy's net lifetime benefits are positive.
+
+        Args:
+            scenario_id: Scenario primary key
+        """
+        table = connection.ops.quote_name(SSStrategy._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                UPDATE {table} AS s
+                SET optimal_rank = r.new_rank,
+                    percentage_of_maximum = r.pct
+                FROM (
+                    SELECT id,
+                           CASE WHEN net_lifetime_benefits IS NOT NULL
+                                THEN RANK() OVER (ORDER BY net_lifetime_benefits DESC NULLS LAST)
+                           END AS new_rank,
+                           CASE WHEN MAX(net_lifetime_benefits) OVER () > 0
+                                THEN net_lifetime_benefits * 100.0 / MAX(net_lifetime_benefits) OVER ()
+                           END AS pct
+                    FROM {table}
+                    WHERE scenario_id = %s
+                ) AS r
+                WHERE s.id = r.id
+            """, [scenario_id])
+
     @staticmethod
     def compare_strategies(scenario, strategy_ids):
         """
@@ -462,7 +646,9 @@ class SSStrategyService:
                 'lifetime_benefits': float(strategy.lifetime_benefits_total or 0),
                 'total_taxes': float(strategy.total_taxes or 0),
                 'total_irmaa': float(strategy.total_irmaa or 0),
-                'net_benefits': float(strategy.net_lifetime_benefits or 0)
+                'net_benefits': float(strategy.net_lifetime_benefits or 0),
+                'optimal_rank': strategy.optimal_rank,
+                'percentage_of_maximum': strategy.percentage_of_maximum
             },
             'notes': strategy.notes,
             'calculated_at': strategy.calculated_at.isoformat() if strategy.calculated_at else None
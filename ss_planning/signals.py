@@ -0,0 +1,60 @@
+"""
+Social Security Planning Signals
+
+Keeps the preview caches in ss_planning.services in sync with the core models
+they are built from. Invalidation waits for the transaction to commit so a
+concurrent preview cannot cache data from before the change.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Client, IncomeSource, Scenario, Spouse
+from .models import SSStrategy
+from .services import (
+    SSStrategyService,
+    invalidate_preview_responses_on_commit,
+    invalidate_scenario_cache_on_commit,
+)
+
+
+@receiver([post_save, post_delete], sender=Scenario)
+def invalidate_on_scenario_change(sender, instance, **kwargs):
+    """Drop cached preview inputs when the scenario itself changes."""
+    invalidate_scenario_cache_on_commit(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=IncomeSource)
+def invalidate_on_income_source_change(sender, instance, **kwargs):
+    """Income sources do not bump scenario.updated_at, so invalidate explicitly."""
+    invalidate_scenario_cache_on_commit(instance.scenario_id)
+
+
+@receiver([post_save, post_delete], sender=Client)
+def invalidate_on_client_change(sender, instance, **kwargs):
+    """Client fields (birthdate, tax status) feed every scenario for that client."""
+    invalidate_scenario_cache_on_commit(
+        *Scenario.objects.filter(client_id=instance.pk).values_list('id', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=Spouse)
+def invalidate_on_spouse_change(sender, instance, **kwargs):
+    """Spouse fields feed every scenario for the owning client."""
+    invalidate_scenario_cache_on_commit(
+        *Scenario.objects.filter(client_id=instance.client_id).values_list('id', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=SSStrategy)
+def invalidate_on_strategy_change(sender, instance, **kwargs):
+    """The active strategy feeds comparison_to_current, but not the processor base."""
+    invalidate_preview_responses_on_commit(instance.scenario_id)
+
+
+@receiver(post_delete, sender=SSStrategy)
+def update_rankings_on_strategy_delete(sender, instance, **kwargs):
+    """Re-rank the remaining strategies; saves already re-rank in SSStrategyService.save_strategy."""
+    scenario_id = instance.scenario_id
+    transaction.on_commit(lambda: SSStrategyService.update_rankings(scenario_id), robust=True)
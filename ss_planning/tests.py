@@ -1,3 +1,377 @@
-from django.test import TestCase
+"""
+Tests for Social Security Planning utilities, request parsing and preview
+cache invalidation.
+"""
 
-# Create your tests here.
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Client, IncomeSource, Scenario
+
+from .models import SSStrategy
+from .utils import (
+    calculate_benefit_adjustment,
+    calculate_earnings_test_reduction,
+    calculate_fra,
+    calculate_monthly_benefit,
+    format_fra_display,
+    get_current_age,
+    get_life_expectancy,
+)
+from .services import SSPreviewService, SSStrategyService, bump_preview_version, get_preview_versions
+from .views import PreviewParams
+
+
+class FullRetirementAgeTests(SimpleTestCase):
+    """calculate_fra follows the SSA birth-year table."""
+
+    def test_boundaries(self):
+        self.assertEqual(calculate_fra(date(1930, 5, 1)), 65.0)
+        self.assertEqual(calculate_fra(date(1960, 1, 2)), 67.0)
+        self.assertEqual(calculate_fra(date(1975, 7, 4)), 67.0)
+
+    def test_table_lookup(self):
+        self.assertAlmostEqual(calculate_fra(date(1938, 3, 1)), 65 + 2 / 12)
+        self.assertAlmostEqual(calculate_fra(date(1957, 3, 1)), 66.5)
+
+    def test_gap_years_use_next_listed_year(self):
+        # 1944-1953 are not listed individually; their FRA is 66
+        self.assertEqual(calculate_fra(date(1950, 6, 15)), 66.0)
+
+    def test_accepts_iso_string(self):
+        self.assertAlmostEqual(calculate_fra('1958-03-15'), 66 + 8 / 12)
+
+
+class FraDisplayTests(SimpleTestCase):
+    """format_fra_display renders FRA as years and months."""
+
+    def test_whole_years(self):
+        self.assertEqual(format_fra_display(67.0), "67")
+
+    def test_months(self):
+        self.assertEqual(format_fra_display(66 + 8 / 12), "66 and 8 months")
+
+    def test_values_outside_the_table(self):
+        self.assertEqual(format_fra_display(66 + 1 / 12), "66 and 1 month")
+
+
+class LifeExpectancyTests(SimpleTestCase):
+    """get_life_expectancy interpolates the SSA period life table."""
+
+    def test_listed_age(self):
+        self.assertEqual(get_life_expectancy(65, 'male'), 84)  # 65 + 18.5
+
+    def test_interpolated_age(self):
+        self.assertEqual(get_life_expectancy(66, 'female'), 86)  # 66 + 20.1
+
+    def test_ages_outside_table_are_clamped(self):
+        self.assertEqual(get_life_expectancy(55, 'male'), 78)  # 55 + 22.6
+        self.assertEqual(get_life_expectancy(95, 'female'), 100)  # 95 + 5.1
+
+    def test_health_adjustment_and_unknown_gender(self):
+        self.assertEqual(get_life_expectancy(70, 'Other', 'excellent'), 87)  # 70 + 14.4 + 3
+
+
+class CurrentAgeTests(SimpleTestCase):
+    """get_current_age counts whole years up to the reference date."""
+
+    def test_before_and_after_birthday(self):
+        self.assertEqual(get_current_age(date(1960, 6, 15), today=date(2025, 6, 14)), 64)
+        self.assertEqual(get_current_age(date(1960, 6, 15), today=date(2025, 6, 15)), 65)
+
+    def test_accepts_iso_string(self):
+        self.assertEqual(get_current_age('1958-03-15', today=date(2025, 1, 1)), 66)
+
+    def test_defaults_to_today(self):
+        today = date.today()
+        self.assertEqual(get_current_age(date(today.year - 40, 1, 1)), 40)
+
+
+class BenefitAdjustmentTests(SimpleTestCase):
+    """calculate_benefit_adjustment applies 0.67%/month around FRA within bounds."""
+
+    def test_at_fra(self):
+        self.assertEqual(calculate_benefit_adjustment(67, 67.0), 1.0)
+
+    def test_early_and_delayed(self):
+        self.assertEqual(calculate_benefit_adjustment(66, 67.0), 0.9196)
+        self.assertEqual(calculate_benefit_adjustment(68, 67.0), 1.0804)
+
+    def test_bounds(self):
+        self.assertEqual(calculate_benefit_adjustment(62, 67.0), 0.7)
+        self.assertEqual(calculate_benefit_adjustment(70, 66.0), 1.24)
+
+
+class MonthlyBenefitTests(SimpleTestCase):
+    """calculate_monthly_benefit applies the claiming-age adjustment."""
+
+    def test_benefit_at_fra_is_unchanged(self):
+        self.assertEqual(calculate_monthly_benefit(Decimal('2500.00'), 67, 67.0), Decimal('2500.00'))
+
+    def test_early_claiming_reduces_benefit(self):
+        # 60 months early: 1 - 60 * 0.0067 = 0.598, clamped to 0.7
+        self.assertEqual(calculate_monthly_benefit(2000.0, 62, 67.0), Decimal('1400.00'))
+
+    def test_returns_decimal_rounded_to_cents(self):
+        result = calculate_monthly_benefit(Decimal('1234.56'), 66, 67.0)
+        self.assertIsInstance(result, Decimal)
+        self.assertEqual(result, Decimal('1135.30'))
+
+
+class EarningsTestReductionTests(SimpleTestCase):
+    """calculate_earnings_test_reduction withholds $1 for every $2 over the limit."""
+
+    def test_no_reduction_at_or_after_fra(self):
+        self.assertEqual(calculate_earnings_test_reduction(100000, 67, 67.0), Decimal(0))
+
+    def test_no_reduction_under_limit(self):
+        self.assertEqual(calculate_earnings_test_reduction(20000, 63, 67.0), Decimal('0.00'))
+
+    def test_reduction_over_limit(self):
+        self.assertEqual(calculate_earnings_test_reduction(Decimal('32320'), 63, 67.0), Decimal('5000.00'))
+
+
+class PreviewParamsTests(SimpleTestCase):
+    """PreviewParams.from_querydict validates ss_preview query parameters."""
+
+    def test_parses_all_parameters(self):
+        params, error = PreviewParams.from_querydict({
+            'primary_claiming_age': '67.5',
+            'spouse_claiming_age': '70',
+            'life_expectancy_primary': '92',
+            'life_expectancy_spouse': '95',
+            'survivor_takes_higher_benefit': 'True',
+        })
+        self.assertIsNone(error)
+        self.assertEqual(params, PreviewParams(67.5, 70.0, 92, 95, True))
+
+    def test_optional_parameters_default_to_none(self):
+        params, error = PreviewParams.from_querydict({'primary_claiming_age': '62', 'spouse_claiming_age': ''})
+        self.assertIsNone(error)
+        self.assertEqual(params, PreviewParams(62.0))
+
+    def test_primary_claiming_age_required(self):
+        params, error = PreviewParams.from_querydict({})
+        self.assertIsNone(params)
+        self.assertEqual(error.status_code, 400)
+        self.assertEqual(error.data, {'error': 'primary_claiming_age is required'})
+
+    def test_rejects_out_of_range_and_non_numeric_values(self):
+        for query in (
+            {'primary_claiming_age': '61.9'},
+            {'primary_claiming_age': 'nan'},
+            {'primary_claiming_age': 'abc'},
+            {'primary_claiming_age': '67', 'spouse_claiming_age': '71'},
+            {'primary_claiming_age': '67', 'life_expectancy_primary': '90.5'},
+        ):
+            with self.subTest(query=query):
+                params, error = PreviewParams.from_querydict(query)
+                self.assertIsNone(params)
+                self.assertEqual(error.status_code, 400)
+
+
+class PreviewVersionCacheFailureTests(SimpleTestCase):
+    """Preview version tokens degrade to None instead of raising when the cache is down."""
+
+    def test_get_returns_none_on_cache_error(self):
+        with mock.patch('ss_planning.services.cache.get_many', side_effect=ConnectionError):
+            self.assertIsNone(get_preview_versions(1))
+
+    def test_bump_swallows_cache_error(self):
+        with mock.patch('ss_planning.services.cache.set_many', side_effect=ConnectionError):
+            bump_preview_version(1)
+
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PreviewVersionSignalTests(TestCase):
+    """Saving or deleting preview inputs changes the preview version once the transaction commits."""
+
+    def setUp(self):
+        cache.clear()
+        advisor = get_user_model().objects.create_user(
+            username='ssadvisor', email='ssadvisor@test.com', password='testpass123'
+        )
+        client = Client.objects.create(
+            advisor=advisor, first_name='Test', last_name='Client', email='client@test.com',
+            birthdate=date(1962, 3, 15), gender='Male', tax_status='Single'
+        )
+        self.scenario = Scenario.objects.create(client=client, name='SS Scenario')
+
+    def _create_income_source(self):
+        return IncomeSource.objects.create(
+            scenario=self.scenario, owned_by='primary', income_type='social_security',
+            income_name='Social Security', monthly_amount=2000,
+            age_to_begin_withdrawal=67, age_to_end_withdrawal=90
+        )
+
+    def test_income_source_save_changes_version(self):
+        before = get_preview_versions(self.scenario.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_income_source()
+        self.assertNotEqual(get_preview_versions(self.scenario.pk), before)
+
+    def test_income_source_delete_changes_version(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            income_source = self._create_income_source()
+        before = get_preview_versions(self.scenario.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            income_source.delete()
+        self.assertNotEqual(get_preview_versions(self.scenario.pk), before)
+
+    def test_version_unchanged_until_commit(self):
+        before = get_preview_versions(self.scenario.pk)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self._create_income_source()
+            self._create_income_source()
+        self.assertEqual(get_preview_versions(self.scenario.pk), before)
+
+        with mock.patch('ss_planning.services.cache.set_many', wraps=cache.set_many) as set_many:
+            for callback in callbacks:
+                callback()
+        set_many.assert_called_once()
+        self.assertNotEqual(get_preview_versions(self.scenario.pk), before)
+
+    def test_strategy_save_changes_only_response_version(self):
+        input_before, response_before = get_preview_versions(self.scenario.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            SSStrategy.objects.create(
+                scenario=self.scenario, name='Delay', primary_claiming_age=70,
+                life_expectancy_primary=90
+            )
+        input_after, response_after = get_preview_versions(self.scenario.pk)
+        self.assertEqual(input_after, input_before)
+        self.assertNotEqual(response_after, response_before)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PreviewEndpointCacheTests(TestCase):
+    """ss_preview answers repeats with 304 or the cached body, and changes ETag with its inputs."""
+
+    def setUp(self):
+        cache.clear()
+        advisor = get_user_model().objects.create_user(
+            username='ssadvisor', email='ssadvisor@test.com', password='testpass123'
+        )
+        client = Client.objects.create(
+            advisor=advisor, first_name='Test', last_name='Client', email='client@test.com',
+            birthdate=date(1962, 3, 15), gender='Male', tax_status='Single'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.scenario = Scenario.objects.create(client=client, name='SS Scenario')
+            self.income_source = IncomeSource.objects.create(
+                scenario=self.scenario, owned_by='primary', income_type='social_security',
+                income_name='Social Security', monthly_amount=2500,
+                age_to_begin_withdrawal=67, age_to_end_withdrawal=90
+            )
+        self.api = APIClient()
+        self.api.force_authenticate(user=advisor)
+        self.url = f'/api/ss-planning/scenarios/{self.scenario.id}/preview/'
+        self.query = {'primary_claiming_age': 68}
+
+    def test_matching_etag_returns_304(self):
+        first = self.api.get(self.url, self.query)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertTrue(first['ETag'])
+
+        second = self.api.get(self.url, self.query, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_income_source_change_changes_etag(self):
+        first = self.api.get(self.url, self.query)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.income_source.monthly_amount = 3000
+            self.income_source.save()
+
+        second = self.api.get(self.url, self.query, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    def test_cached_body_matches_fresh_body(self):
+        self.api.get(self.url, self.query)
+
+        with mock.patch.object(SSPreviewService, 'generate_preview') as generate_preview:
+            cached = self.api.get(self.url, self.query)
+        generate_preview.assert_not_called()
+
+        # Without version tokens the view skips every cache layer
+        with mock.patch('ss_planning.views.get_preview_versions', return_value=None):
+            fresh = self.api.get(self.url, self.query)
+        self.assertNotIn('ETag', fresh)
+
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached.json(), fresh.json())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class StrategyRankingTests(TestCase):
+    """update_rankings ranks saved strategies by net lifetime benefits."""
+
+    def setUp(self):
+        advisor = get_user_model().objects.create_user(
+            username='ssadvisor', email='ssadvisor@test.com', password='testpass123'
+        )
+        client = Client.objects.create(
+            advisor=advisor, first_name='Test', last_name='Client', email='client@test.com',
+            birthdate=date(1962, 3, 15), gender='Male', tax_status='Single'
+        )
+        self.scenario = Scenario.objects.create(client=client, name='SS Scenario')
+
+    def _rank(self, *net_benefits):
+        for i, net in enumerate(net_benefits):
+            SSStrategy.objects.create(
+                scenario=self.scenario, name=f'Strategy {i}', primary_claiming_age=67,
+                life_expectancy_primary=90, net_lifetime_benefits=net
+            )
+        SSStrategyService.update_rankings(self.scenario.pk)
+        return self._rankings()
+
+    def _rankings(self):
+        return list(
+            SSStrategy.objects.filter(scenario=self.scenario)
+            .order_by('name')
+            .values_list('optimal_rank', 'percentage_of_maximum')
+        )
+
+    def test_ties_share_a_rank(self):
+        self.assertEqual(
+            self._rank(Decimal('1000'), Decimal('1000'), Decimal('500')),
+            [(1, 100.0), (1, 100.0), (3, 50.0)]
+        )
+
+    def test_missing_net_benefits_are_unranked(self):
+        self.assertEqual(
+            self._rank(None, Decimal('800'), Decimal('400')),
+            [(None, None), (1, 100.0), (2, 50.0)]
+        )
+
+    def test_zero_maximum_has_no_percentage(self):
+        self.assertEqual(
+            self._rank(Decimal('0'), Decimal('-100')),
+            [(1, None), (2, None)]
+        )
+
+    def test_negative_maximum_has_no_percentage(self):
+        self.assertEqual(
+            self._rank(Decimal('-50'), Decimal('-100')),
+            [(1, None), (2, None)]
+        )
+
+    def test_delete_reranks_remaining_strategies(self):
+        self._rank(Decimal('1000'), Decimal('800'), Decimal('400'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            SSStrategy.objects.get(scenario=self.scenario, name='Strategy 0').delete()
+
+        self.assertEqual(self._rankings(), [(1, 100.0), (2, 50.0)])
@@ -5,8 +5,11 @@ This module provides utility functions for Social Security calculations,
 including FRA determination, life expectancy lookups, and benefit adjustments.
 """
 
-from datetime import datetime
+import time
+from bisect import bisect_left
+from datetime import date
 from decimal import Decimal
+from functools import lru_cache
 
 
 # Full Retirement Age (FRA) by birth year
@@ -27,6 +30,10 @@ FRA_BY_BIRTH_YEAR = {
     1960: 67.0,
 }
 
+# FRA table sorted once at import for bisect lookups in calculate_fra
+_FRA_YEARS_SORTED = sorted(FRA_BY_BIRTH_YEAR)
+_FRA_VALUES_SORTED = [FRA_BY_BIRTH_YEAR[year] for year in _FRA_YEARS_SORTED]
+
 # SSA Period Life Table - Expected additional years of life
 # Source: SSA Actuarial Life Table 2020
 LIFE_EXPECTANCY_TABLES = {
@@ -54,6 +61,42 @@ LIFE_EXPECTANCY_TABLES = {
     }
 }
 
+
+def _interpolate_additional_years(table, current_age):
+    """Linearly interpolate additional life years from a sparse SSA table, clamping at the ends."""
+    if current_age in table:
+        return table[current_age]
+
+    ages = sorted(table.keys())
+    if current_age < ages[0]:
+        return table[ages[0]]
+    if current_age > ages[-1]:
+        return table[ages[-1]]
+
+    # Find surrounding ages
+    for i, age in enumerate(ages):
+        if age > current_age:
+            lower_age = ages[i-1]
+            upper_age = age
+            lower_years = table[lower_age]
+            upper_years = table[upper_age]
+
+            # Linear interpolation
+            ratio = (current_age - lower_age) / (upper_age - lower_age)
+            return lower_years + ratio * (upper_years - lower_years)
+
+
+# Life tables interpolated once at import for every integer age in range
+_LIFE_EXPECTANCY_MIN_AGE = 50
+_LIFE_EXPECTANCY_MAX_AGE = 100
+_LIFE_EXPECTANCY_DENSE = {
+    gender: tuple(
+        _interpolate_additional_years(table, age)
+        for age in range(_LIFE_EXPECTANCY_MIN_AGE, _LIFE_EXPECTANCY_MAX_AGE + 1)
+    )
+    for gender, table in LIFE_EXPECTANCY_TABLES.items()
+}
+
 # 2025 Earnings Test Limits
 EARNINGS_TEST_LIMITS = {
     2025: {
@@ -62,6 +105,15 @@ EARNINGS_TEST_LIMITS = {
     }
 }
 
+# Earnings test thresholds as floats, so the per-call math avoids Decimal
+_EARNINGS_LIMIT_BEFORE_FRA = {
+    year: float(limits['before_fra']) for year, limits in EARNINGS_TEST_LIMITS.items()
+}
+
+# Cached (date, time.monotonic()) pair used by get_current_age
+_today_cache = (None, 0.0)
+_TODAY_CACHE_SECONDS = 60
+
 # Social Security benefit adjustment factors
 EARLY_RETIREMENT_PENALTY_MONTHLY = 0.0067  # 0.67% per month before FRA
 DELAYED_RETIREMENT_CREDIT_MONTHLY = 0.0067  # 0.67% per month after FRA (8% per year)
@@ -69,6 +121,13 @@ MIN_ADJUSTMENT_FACTOR = 0.7   # 30% reduction at age 62
 MAX_ADJUSTMENT_FACTOR = 1.24  # 24% increase at age 70
 
 
+def _to_date(birthdate):
+    """Accept a date or an ISO 'YYYY-MM-DD' string."""
+    if isinstance(birthdate, str):
+        return date.fromisoformat(birthdate)
+    return birthdate
+
+
 def calculate_fra(birthdate):
     """
     Calculate Full Retirement Age based on birthdate.
@@ -79,11 +138,14 @@ def calculate_fra(birthdate):
     Returns:
         float: Full Retirement Age (e.g., 66.5 for 66 and 6 months)
     """
-    if isinstance(birthdate, str):
-        birthdate = datetime.strptime(birthdate, '%Y-%m-%d').date()
+    birthdate = _to_date(birthdate)
 
-    birth_year = birthdate.year
+    return _calculate_fra_for_year(birthdate.year)
 
+
+@lru_cache(maxsize=512)
+def _calculate_fra_for_year(birth_year):
+    """Full Retirement Age for a birth year (cached; FRA depends only on the year)."""
     # Before 1937
     if birth_year < 1937:
         return 65.0
@@ -92,15 +154,16 @@ def calculate_fra(birthdate):
     if birth_year >= 1960:
         return 67.0
 
-    # Look up in table
-    for year in sorted(FRA_BY_BIRTH_YEAR.keys()):
-        if birth_year <= year:
-            return FRA_BY_BIRTH_YEAR[year]
+    # Look up in table: first listed birth year at or after this one
+    index = bisect_left(_FRA_YEARS_SORTED, birth_year)
+    if index < len(_FRA_YEARS_SORTED):
+        return _FRA_VALUES_SORTED[index]
 
     # Default to 67 if not found
     return 67.0
 
 
+@lru_cache(maxsize=512)
 def get_life_expectancy(current_age, gender='male', health_status='good'):
     """
     Get life expectancy from SSA actuarial tables with health adjustments.
@@ -117,31 +180,12 @@ def get_life_expectancy(current_age, gender='male', health_status='good'):
     if gender not in ['male', 'female']:
         gender = 'male'
 
-    table = LIFE_EXPECTANCY_TABLES.get(gender, LIFE_EXPECTANCY_TABLES['male'])
-
-    # Find closest age in table or interpolate
-    if current_age in table:
-        additional_years = table[current_age]
+    # Integer ages come straight from the precomputed table; others interpolate
+    if isinstance(current_age, int):
+        index = min(max(current_age, _LIFE_EXPECTANCY_MIN_AGE), _LIFE_EXPECTANCY_MAX_AGE) - _LIFE_EXPECTANCY_MIN_AGE
+        additional_years = _LIFE_EXPECTANCY_DENSE[gender][index]
     else:
-        # Interpolate between closest ages
-        ages = sorted(table.keys())
-        if current_age < ages[0]:
-            additional_years = table[ages[0]]
-        elif current_age > ages[-1]:
-            additional_years = table[ages[-1]]
-        else:
-            # Find surrounding ages
-            for i, age in enumerate(ages):
-                if age > current_age:
-                    lower_age = ages[i-1]
-                    upper_age = age
-                    lower_years = table[lower_age]
-                    upper_years = table[upper_age]
-
-                    # Linear interpolation
-                    ratio = (current_age - lower_age) / (upper_age - lower_age)
-                    additional_years = lower_years + ratio * (upper_years - lower_years)
-                    break
+        additional_years = _interpolate_additional_years(LIFE_EXPECTANCY_TABLES[gender], current_age)
 
     # Apply health status adjustment
     health_adjustments = {
@@ -157,6 +201,7 @@ def get_life_expectancy(current_age, gender='male', health_status='good'):
     return int(round(life_expectancy))
 
 
+@lru_cache(maxsize=512)
 def calculate_benefit_adjustment(claiming_age, fra=67.0):
     """
     Calculate Social Security benefit adjustment factor based on claiming age.
@@ -168,19 +213,11 @@ def calculate_benefit_adjustment(claiming_age, fra=67.0):
     Returns:
         float: Adjustment factor (e.g., 0.75 for 25% reduction, 1.24 for 24% increase)
     """
-    claiming_age = float(claiming_age)
-    fra = float(fra)
-
-    adjustment_factor = 1.0
-
-    if claiming_age < fra:
-        # Early retirement reduction
-        months_early = (fra - claiming_age) * 12
-        adjustment_factor -= months_early * EARLY_RETIREMENT_PENALTY_MONTHLY
-    elif claiming_age > fra:
-        # Delayed retirement credit
-        months_delayed = (claiming_age - fra) * 12
-        adjustment_factor += months_delayed * DELAYED_RETIREMENT_CREDIT_MONTHLY
+    # EARLY_RETIREMENT_PENALTY_MONTHLY and DELAYED_RETIREMENT_CREDIT_MONTHLY are
+    # the same rate, so the sign of the month offset covers both cases; split
+    # this back into two branches if the rates ever diverge
+    months_from_fra = (float(claiming_age) - float(fra)) * 12
+    adjustment_factor = 1.0 + months_from_fra * DELAYED_RETIREMENT_CREDIT_MONTHLY
 
     # Apply bounds
     adjustment_factor = max(MIN_ADJUSTMENT_FACTOR, min(adjustment_factor, MAX_ADJUSTMENT_FACTOR))
@@ -198,14 +235,14 @@ def calculate_monthly_benefit(amount_at_fra, claiming_age, fra=67.0):
         fra (float): Full Retirement Age
 
     Returns:
-        Decimal: Adjusted monthly benefit
+        Decimal: Adjusted monthly benefit, rounded to cents
     """
-    if isinstance(amount_at_fra, float):
-        amount_at_fra = Decimal(str(amount_at_fra))
-
     adjustment_factor = calculate_benefit_adjustment(claiming_age, fra)
 
-    return amount_at_fra * Decimal(str(adjustment_factor))
+    # Float precision is ample for a single multiply; round to cents on the way out
+    monthly_benefit = float(amount_at_fra) * adjustment_factor
+
+    return Decimal(f"{monthly_benefit:.2f}")
 
 
 def calculate_earnings_test_reduction(annual_earnings, claiming_age, fra, year=2025):
@@ -224,32 +261,50 @@ def calculate_earnings_test_reduction(annual_earnings, claiming_age, fra, year=2
     if claiming_age >= fra:
         return Decimal(0)  # No earnings test at or after FRA
 
-    annual_earnings = Decimal(str(annual_earnings))
-    limits = EARNINGS_TEST_LIMITS.get(year, EARNINGS_TEST_LIMITS[2025])
-    limit = Decimal(str(limits['before_fra']))
+    limit = _EARNINGS_LIMIT_BEFORE_FRA.get(year, _EARNINGS_LIMIT_BEFORE_FRA[2025])
 
-    excess_earnings = max(Decimal(0), annual_earnings - limit)
+    excess_earnings = max(0.0, float(annual_earnings) - limit)
 
     # $1 withheld for every $2 over limit
-    reduction = excess_earnings / Decimal(2)
+    reduction = excess_earnings / 2
 
-    return reduction
+    return Decimal(f"{reduction:.2f}")
 
 
-def get_current_age(birthdate):
+def get_current_age(birthdate, today=None):
     """
     Calculate current age from birthdate.
 
     Args:
         birthdate (datetime.date or str): Birthdate
+        today (datetime.date, optional): Reference date; callers in a loop can
+            pass a fixed value. Defaults to today's date.
 
     Returns:
         int: Current age
     """
-    if isinstance(birthdate, str):
-        birthdate = datetime.strptime(birthdate, '%Y-%m-%d').date()
+    birthdate = _to_date(birthdate)
+
+    if today is None:
+        today = _get_today()
+
+    return _age_on(birthdate, today)
+
 
-    today = datetime.now().date()
+def _get_today():
+    """Today's date, refreshed at most once every _TODAY_CACHE_SECONDS."""
+    global _today_cache
+    today, fetched_at = _today_cache
+    now = time.monotonic()
+    if today is None or now - fetched_at > _TODAY_CACHE_SECONDS:
+        today = date.today()
+        _today_cache = (today, now)
+    return today
+
+
+@lru_cache(maxsize=1024)
+def _age_on(birthdate, today):
+    """Age in whole years on a given date."""
     age = today.year - birthdate.year
 
     # Adjust if birthday hasn't occurred yet this year
@@ -269,6 +324,14 @@ def format_fra_display(fra):
     Returns:
         str: Formatted FRA string
     """
+    display = _FRA_DISPLAY.get(fra)
+    if display is None:
+        display = _format_fra(fra)
+    return display
+
+
+def _format_fra(fra):
+    """Format an arbitrary FRA value; format_fra_display serves table values from _FRA_DISPLAY."""
     years = int(fra)
     months = round((fra - years) * 12)
 
@@ -276,3 +339,10 @@ def format_fra_display(fra):
         return str(years)
     else:
         return f"{years} and {months} months" if months > 1 else f"{years} and {months} month"
+
+
+# Every FRA calculate_fra can return, formatted once at import
+_FRA_DISPLAY = {
+    fra: _format_fra(fra)
+    for fra in set(FRA_BY_BIRTH_YEAR.values()) | {65.0, 67.0}
+}
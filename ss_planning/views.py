@@ -4,17 +4,152 @@ Social Security Planning API Views
 This module provides REST API endpoints for Social Security planning features.
 """
 
+import hashlib
+import json
+import logging
+from dataclasses import astuple, dataclass
+from typing import Optional
+
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 
 from core.models import Scenario
+from core.services.cache_service import CacheService
 from .models import SSStrategy
-from .services import SSPreviewService, SSStrategyService
+from .services import SSPreviewService, SSStrategyService, get_preview_versions
 from .utils import calculate_fra, get_life_expectancy, get_current_age
 
+logger = logging.getLogger(__name__)
+
+MIN_CLAIMING_AGE = 62
+MAX_CLAIMING_AGE = 70
+
+
+def _bad_request(message):
+    return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _internal_error():
+    """Generic 500 body; details go to the log, not the client."""
+    return Response({'error': 'Internal error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _parse_number(value, convert):
+    """Convert a query value, returning None if it is not a valid number."""
+    try:
+        return convert(value)
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class PreviewParams:
+    """Validated query parameters for ss_preview."""
+
+    primary_claiming_age: float
+    spouse_claiming_age: Optional[float] = None
+    life_expectancy_primary: Optional[int] = None
+    life_expectancy_spouse: Optional[int] = None
+    survivor_takes_higher_benefit: Optional[bool] = None  # None uses the scenario default
+
+    @classmethod
+    def from_querydict(cls, qd):
+        """
+        Parse and validate preview query parameters.
+
+        Returns:
+            (PreviewParams, None) on success, or (None, Response) with a 400 error
+        """
+        raw = qd.get('primary_claiming_age')
+        if not raw:
+            return None, _bad_request('primary_claiming_age is required')
+        primary_claiming_age = _parse_number(raw, float)
+        if primary_claiming_age is None:
+            return None, _bad_request('Invalid primary_claiming_age: must be a number')
+        if not (MIN_CLAIMING_AGE <= primary_claiming_age <= MAX_CLAIMING_AGE):
+            return None, _bad_request(
+                'Invalid primary_claiming_age: Claiming age must be between 62 and 70'
+            )
+
+        spouse_claiming_age = None
+        raw = qd.get('spouse_claiming_age')
+        if raw:
+            spouse_claiming_age = _parse_number(raw, float)
+            if spouse_claiming_age is None:
+                return None, _bad_request('Invalid spouse_claiming_age: must be a number')
+            if not (MIN_CLAIMING_AGE <= spouse_claiming_age <= MAX_CLAIMING_AGE):
+                return None, _bad_request(
+                    'Invalid spouse_claiming_age: Spouse claiming age must be between 62 and 70'
+                )
+
+        life_expectancies = {}
+        for name in ('life_expectancy_primary', 'life_expectancy_spouse'):
+            raw = qd.get(name)
+            value = None
+            if raw:
+                value = _parse_number(raw, int)
+                if value is None:
+                    return None, _bad_request(f'Invalid {name}: must be a whole number')
+            life_expectancies[name] = value
+
+        survivor_takes_higher_benefit = qd.get('survivor_takes_higher_benefit')
+        if survivor_takes_higher_benefit is not None:
+            survivor_takes_higher_benefit = survivor_takes_higher_benefit.lower() == 'true'
+
+        return cls(
+            primary_claiming_age=primary_claiming_age,
+            spouse_claiming_age=spouse_claiming_age,
+            survivor_takes_higher_benefit=survivor_takes_higher_benefit,
+            **life_expectancies
+        ), None
+
+
+def get_scenario_for_advisor(scenario_id, advisor):
+    """
+    Fetch a scenario owned by the advisor, with its client and spouse joined in.
+
+    Income sources are not prefetched: previews reuse a cached processor base
+    and client_info only loads the Social Security rows.
+
+    Raises:
+        Http404: If the scenario does not exist or belongs to another advisor
+    """
+    return get_object_or_404(
+        Scenario.objects.select_related('client', 'client__spouse'),
+        id=scenario_id,
+        client__advisor=advisor
+    )
+
+
+def _preview_etag(scenario, params, versions):
+    """
+    ETag for a preview: the scenario and its version tokens plus every query parameter.
+
+    Returns None when the shared version tokens are unavailable, since an
+    ETag without them could not be invalidated.
+    """
+    if versions is None:
+        return None
+    key = repr((
+        scenario.pk,
+        scenario.updated_at.timestamp() if scenario.updated_at else None,
+    ) + tuple(versions) + astuple(params))
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _with_preview_etag(response, etag):
+    """Attach the ETag and require revalidation so browsers send If-None-Match."""
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -52,89 +187,60 @@ def ss_preview(request, scenario_id):
         }
     """
     # Get scenario (ensure user owns this scenario through client->advisor relationship)
-    scenario = get_object_or_404(Scenario, id=scenario_id, client__advisor=request.user)
-
-    # Validate parameters
-    primary_claiming_age = request.GET.get('primary_claiming_age')
-    if not primary_claiming_age:
-        return Response(
-            {'error': 'primary_claiming_age is required'},
-            status=status.HTTP_400_BAD_REQUEST
+    scenario = get_scenario_for_advisor(scenario_id, request.user)
+
+    params, error_response = PreviewParams.from_querydict(request.GET)
+    if error_response:
+        return error_response
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "ss_preview scenario=%s primary_claiming_age=%s spouse_claiming_age=%s "
+            "life_expectancy_primary=%s life_expectancy_spouse=%s "
+            "survivor_takes_higher_benefit=%s mortality_age=%s",
+            scenario_id, params.primary_claiming_age, params.spouse_claiming_age,
+            params.life_expectancy_primary, params.life_expectancy_spouse,
+            params.survivor_takes_higher_benefit, scenario.mortality_age
         )
 
-    try:
-        primary_claiming_age = float(primary_claiming_age)
-        if not (62 <= primary_claiming_age <= 70):
-            raise ValueError("Claiming age must be between 62 and 70")
-    except ValueError as e:
-        return Response(
-            {'error': f'Invalid primary_claiming_age: {str(e)}'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-
-    # Optional parameters
-    spouse_claiming_age = request.GET.get('spouse_claiming_age')
-    if spouse_claiming_age:
-        try:
-            spouse_claiming_age = float(spouse_claiming_age)
-            if not (62 <= spouse_claiming_age <= 70):
-                raise ValueError("Spouse claiming age must be between 62 and 70")
-        except ValueError as e:
-            return Response(
-                {'error': f'Invalid spouse_claiming_age: {str(e)}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-    life_expectancy_primary = request.GET.get('life_expectancy_primary')
-    if life_expectancy_primary:
-        life_expectancy_primary = int(life_expectancy_primary)
-
-    life_expectancy_spouse = request.GET.get('life_expectancy_spouse')
-    if life_expectancy_spouse:
-        life_expectancy_spouse = int(life_expectancy_spouse)
-
-    # Optional: survivor_takes_higher_benefit override
-    survivor_takes_higher_benefit = request.GET.get('survivor_takes_higher_benefit')
-    if survivor_takes_higher_benefit is not None:
-        survivor_takes_higher_benefit = survivor_takes_higher_benefit.lower() == 'true'
-    else:
-        survivor_takes_higher_benefit = None  # Use scenario default
-
-    # DEBUG: Log all parameters
-    print(f"\n{'='*80}")
-    print(f"DEBUG: ss_preview API called with parameters:")
-    print(f"  scenario_id: {scenario_id}")
-    print(f"  primary_claiming_age: {primary_claiming_age}")
-    print(f"  spouse_claiming_age: {spouse_claiming_age}")
-    print(f"  life_expectancy_primary: {life_expectancy_primary}")
-    print(f"  life_expectancy_spouse: {life_expectancy_spouse}")
-    print(f"  survivor_takes_higher_benefit: {survivor_takes_higher_benefit}")
-    print(f"  scenario.mortality_age (original): {scenario.mortality_age}")
-    print(f"{'='*80}\n")
+    # Identical previews (e.g. a slider moved back) are answered from the
+    # browser's copy via If-None-Match, or from the shared cache. Both are
+    # skipped when the cache is down.
+    versions = get_preview_versions(scenario.pk)
+    preview_key = _preview_etag(scenario, params, versions)
+    if preview_key is not None:
+        etag = quote_etag(preview_key)
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return _with_preview_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        cache_key = f"ss_preview:{preview_key}"
+        preview_data = CacheService.get(cache_key)
+        if preview_data is not None:
+            return _with_preview_etag(Response(preview_data), etag)
 
     # Generate preview
     try:
         preview_data = SSPreviewService.generate_preview(
             scenario,
-            primary_claiming_age,
-            spouse_claiming_age,
-            life_expectancy_primary,
-            life_expectancy_spouse,
-            survivor_takes_higher_benefit
+            params.primary_claiming_age,
+            params.spouse_claiming_age,
+            params.life_expectancy_primary,
+            params.life_expectancy_spouse,
+            params.survivor_takes_higher_benefit,
+            input_version=versions[0] if versions else None
         )
+    except Exception:
+        logger.exception("ss_preview failed for scenario %s", scenario_id)
+        return _internal_error()
+
+    if preview_key is None:
         return Response(preview_data)
-    except Exception as e:
-        import traceback
-        print(f"\n{'='*80}")
-        print(f"ERROR in ss_preview:")
-        print(f"Exception: {str(e)}")
-        print(f"Traceback:")
-        traceback.print_exc()
-        print(f"{'='*80}\n")
-        return Response(
-            {'error': f'Failed to generate preview: {str(e)}'},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+
+    # Store the JSON-rendered form so cached and fresh responses are identical
+    preview_data = json.loads(json.dumps(preview_data, cls=JSONEncoder))
+    CacheService.set(cache_key, preview_data, cache_type='ss_preview')
+
+    return _with_preview_etag(Response(preview_data), etag)
 
 
 @api_view(['POST'])
@@ -166,7 +272,7 @@ def save_strategy(request, scenario_id):
             ...
         }
     """
-    scenario = get_object_or_404(Scenario, id=scenario_id, client__advisor=request.user)
+    scenario = get_scenario_for_advisor(scenario_id, request.user)
 
     # Validate required fields
     required_fields = ['name', 'primary_claiming_age']
@@ -190,11 +296,27 @@ def save_strategy(request, scenario_id):
             'created_at': strategy.created_at.isoformat(),
             'calculated_at': strategy.calculated_at.isoformat() if strategy.calculated_at else None
         }, status=status.HTTP_201_CREATED)
-    except Exception as e:
-        return Response(
-            {'error': f'Failed to save strategy: {str(e)}'},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+    except Exception:
+        logger.exception("save_strategy failed for scenario %s", scenario_id)
+        return _internal_error()
+
+
+# Columns returned by list_strategies, read with values() to skip model hydration
+LIST_STRATEGY_FIELDS = (
+    'id', 'name', 'is_active', 'primary_claiming_age', 'spouse_claiming_age',
+    'optimization_goal', 'lifetime_benefits_total', 'net_lifetime_benefits',
+    'total_taxes', 'total_irmaa', 'notes', 'created_at', 'calculated_at',
+)
+_DECIMAL_STRATEGY_FIELDS = ('lifetime_benefits_total', 'net_lifetime_benefits', 'total_taxes', 'total_irmaa')
+
+
+def _format_strategy_row(row):
+    """Convert a list_strategies values() row to its JSON representation."""
+    for field in _DECIMAL_STRATEGY_FIELDS:
+        row[field] = float(row[field] or 0)
+    row['created_at'] = row['created_at'].isoformat()
+    row['calculated_at'] = row['calculated_at'].isoformat() if row['calculated_at'] else None
+    return row
 
 
 @api_view(['GET'])
@@ -218,28 +340,11 @@ def list_strategies(request, scenario_id):
             ]
         }
     """
-    scenario = get_object_or_404(Scenario, id=scenario_id, client__advisor=request.user)
-    strategies = SSStrategy.objects.filter(scenario=scenario)
+    scenario = get_scenario_for_advisor(scenario_id, request.user)
+    strategies = SSStrategy.objects.filter(scenario=scenario).values(*LIST_STRATEGY_FIELDS)
 
     return Response({
-        'strategies': [
-            {
-                'id': s.id,
-                'name': s.name,
-                'is_active': s.is_active,
-                'primary_claiming_age': s.primary_claiming_age,
-                'spouse_claiming_age': s.spouse_claiming_age,
-                'optimization_goal': s.optimization_goal,
-                'lifetime_benefits_total': float(s.lifetime_benefits_total or 0),
-                'net_lifetime_benefits': float(s.net_lifetime_benefits or 0),
-                'total_taxes': float(s.total_taxes or 0),
-                'total_irmaa': float(s.total_irmaa or 0),
-                'notes': s.notes,
-                'created_at': s.created_at.isoformat(),
-                'calculated_at': s.calculated_at.isoformat() if s.calculated_at else None
-            }
-            for s in strategies
-        ]
+        'strategies': [_format_strategy_row(row) for row in strategies]
     })
 
 
@@ -260,7 +365,7 @@ def compare_strategies(request, scenario_id):
             "strategies": [...]
         }
     """
-    scenario = get_object_or_404(Scenario, id=scenario_id, client__advisor=request.user)
+    scenario = get_scenario_for_advisor(scenario_id, request.user)
     strategy_ids = request.data.get('strategy_ids', [])
 
     if not strategy_ids:
@@ -272,11 +377,9 @@ def compare_strategies(request, scenario_id):
     try:
         comparison = SSStrategyService.compare_strategies(scenario, strategy_ids)
         return Response(comparison)
-    except Exception as e:
-        return Response(
-            {'error': f'Failed to compare strategies: {str(e)}'},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+    except Exception:
+        logger.exception("compare_strategies failed for scenario %s", scenario_id)
+        return _internal_error()
 
 
 @api_view(['GET'])
@@ -311,19 +414,18 @@ def client_info(request, scenario_id):
             }
         }
     """
-    scenario = get_object_or_404(Scenario, id=scenario_id, client__advisor=request.user)
+    scenario = get_scenario_for_advisor(scenario_id, request.user)
     client = scenario.client
 
-    # Extract Social Security income sources
-    primary_ss_income = None
-    spouse_ss_income = None
-
-    for income_source in scenario.income_sources.all():
-        if income_source.income_type.lower() in ['social security', 'social_security']:
-            if income_source.owned_by == 'primary':
-                primary_ss_income = income_source
-            elif income_source.owned_by == 'spouse':
-                spouse_ss_income = income_source
+    # Extract Social Security income sources (only the SS rows are fetched)
+    ss_sources = {
+        income_source.owned_by: income_source
+        for income_source in scenario.income_sources.filter(
+            Q(income_type__iexact='social security') | Q(income_type__iexact='social_security')
+        )
+    }
+    primary_ss_income = ss_sources.get('primary')
+    spouse_ss_income = ss_sources.get('spouse')
 
     response = {
         'primary': {